@@ -3,12 +3,18 @@ from api_keys import production_key
 from api_keys import staging_key
 import process_metadata as pm
 import json
+import re
 import requests
-import numpy as np
 # let's just make this a function to pass a single pub to 
 # removes duplicated records based on checking duplicated dois in the csv file and matched DOIs from pure using the api
 # needs to be expanded to include ISBNs and other unique IDs
 
+# a doi that does not match this can't resolve in pure, so there is no point in searching for it
+_DOI_RE = re.compile(r'^10\.\d{4,9}/\S+$')
+_DOI_PREFIX_RE = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', re.IGNORECASE)
+# one session for the whole run, so every pure search reuses the same https connection instead of opening a new one
+_pure_session = requests.Session()
+
 
 def main():
     publications = pm.load_zotero_csv("/Users/elizabethschwartz/Documents/assistantships/scp/pri_import/pri_csv_to_xml_v1/data/pri_import_2022_tech_reports.csv")
@@ -16,7 +22,14 @@ def main():
         print(deduper(publication))
 
 
-def deduper(publication):
+def deduper(publication, seen_dois=None):
+    # seen_dois is the set of normalized dois already written in this run; a doi already in it was written for an
+    # earlier record in the same csv, so the record is a duplicate and pure does not need to be searched again.
+    # deduper only reads the set: the caller adds a doi once its record has actually been written
+    if seen_dois is not None:
+        doi = normalize_doi(pm.get_doi(publication))
+        if doi is not None and doi in seen_dois:
+            return True
     setting = pm.get_research_output_type(publication)['subType']
     if setting == 'article':
         return journal_article_deduper(publication)
@@ -28,8 +41,21 @@ def deduper(publication):
         return False
 
 
+def normalize_doi(doi):
+    # returns the lowercased bare doi (no resolver prefix), or None if it is missing or malformed
+    if not isinstance(doi, str):
+        return None
+    doi = _DOI_PREFIX_RE.sub('', doi.strip()).lower()
+    if _DOI_RE.match(doi):
+        return doi
+    return None
+
+
 def journal_article_deduper(publication):
-    doi = pm.get_doi(publication)
+    doi = normalize_doi(pm.get_doi(publication))
+    if doi is None:
+        # skip the pure api call for missing or malformed dois; treat as no match
+        return False
     pure_results = search_pure(doi, production_key())
     if result_to_doi_matcher(doi, pure_results):
         return True
@@ -39,8 +65,12 @@ def journal_article_deduper(publication):
 
 def book_deduper(publication):
     this_isbn = pm.get_isbn(publication)
+    if not isinstance(this_isbn, str):
+        # get_isbn gives None for missing or malformed isbns; there is nothing to search pure for, so treat as no match
+        return False
     pure_results = search_pure(this_isbn, production_key())
-    if result_isbn_matcher(this_isbn, pure_results):
+    # pure's isbns are compared with their hyphens removed, so remove them from this one too
+    if result_isbn_matcher(this_isbn.replace('-', ''), pure_results):
         return True
     else:
         return False
@@ -56,7 +86,7 @@ def search_pure(search_string, api_key):
         url = 'https://experts.illinois.edu/ws/api/research-outputs/search'
     else:
         url = "https://illinois-staging.pure.elsevier.com/ws/api/research-outputs/search"
-    pure_response = requests.post(url, headers=headers, data=values)
+    pure_response = _pure_session.post(url, headers=headers, data=values)
     if pure_response.status_code == requests.codes.ok:
         pure_response_json = pure_response.json()
         # print(pure_response.json()['items'])
@@ -75,7 +105,8 @@ def result_to_doi_matcher(pub_doi, result_list):
         try:
             e_versions = a_result['electronicVersions']
             for e_version in e_versions:
-                if e_version['doi'] == pub_doi:
+                # pub_doi is normalized (bare and lowercased), so compare pure's doi the same way
+                if normalize_doi(e_version['doi']) == pub_doi:
                     # print({'pub_doi': pub_doi, 'matched_pub': e_version['doi']})
                     return True
                 else:
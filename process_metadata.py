@@ -1,10 +1,30 @@
 import csv
-import numpy as np
+import os
 import pandas as pd
 import re
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process
 import random
 import collections
+import functools
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+_MULTISPACE_RE = re.compile(r'\s\s+')
+# urls in the Url column are separated by semicolons, often with spaces around them
+_URL_SEPARATOR_RE = re.compile(r'\s*;\s*')
+# Zotero columns read as text by load_zotero_csv, whatever their values look like
+_ZOTERO_TEXT_COLUMNS = ('Key', 'Item Type', 'Author', 'Title', 'Publication Title', 'ISBN', 'ISSN', 'DOI', 'Url',
+                        'Abstract Note', 'Date', 'Pages', 'Issue', 'Volume', 'Series', 'Series Number', 'Publisher',
+                        'Place', 'Rights', 'Notes', 'Manual Tags', 'Automatic Tags', 'Editor', 'Edition', 'Extra',
+                        'Number', 'Conference Name')
+# columns read from the Internal Persons export by access_internal_persons, and the names they are given
+_PERSONS_COLUMNS = ("3 Last, first name", "4 Name > Last name", "5 Name > First name", "21 ID",
+                    "10.1 Organizations > Organizational unit[1]")
+_PERSONS_COLUMNS_MAPPER = {'10.1 Organizations > Organizational unit[1]': 'unit'}
+# pickled with the persons DataFrame; bump the version whenever the columns read or their names change, so an older
+# pickle is parsed again instead of being reused. the pandas version is included because pickles don't reliably load
+# across pandas versions
+_PERSONS_CACHE_TAG = ('persons-v1', pd.__version__)
 
 
 def load_preformatted_csv(csv_file: str) -> list:
@@ -37,33 +57,41 @@ def load_preformatted_csv(csv_file: str) -> list:
     return allrows
 
 
-def load_zotero_csv(csv_file: str) -> list:
+def load_zotero_csv(csv_file: str, chunksize: int = 1024) -> Iterator[dict]:
     """
     Load a CSV which has been exported from Zotero.
     https://www.zotero.org/support/kb/item_types_and_fields#item_fields
     See Zotero-Experts-crosswalk.csv for data mapping.
+    The CSV is memory-mapped and read and cleaned chunksize rows at a time, so only one chunk is held in memory.
 
     :param csv_file: A string pointing to the actual file
-    :return: A list of dictionaries, where each row of data is a dictionary containing header:value pairs
+    :param chunksize: Number of CSV rows to read and clean at a time
+    :return: An iterator of dictionaries, where each row of data is a dictionary containing header:value pairs
     """
-    df = pd.read_csv(csv_file, usecols=['Key','Item Type','Publication Year','Author', 'Title', 'Publication Title', 'ISBN',
-                                        'ISSN', 'DOI', 'Url', 'Abstract Note', 'Date', 'Pages', 'Num Pages', 'Issue', 'Volume',
-                                        'Series', 'Series Number', 'Publisher', 'Place', 'Rights', 'Notes', 'Manual Tags',
-                                        'Automatic Tags', 'Editor', 'Edition', 'Extra', 'Number', 'Conference Name'],
-                     dtype={'Publication Year': 'Int64','Num Pages':'Int64','Volume':'object'}, encoding='utf-8')
+    # every column but the two numeric ones is read as text. the type of a column is otherwise guessed separately for
+    # each chunk, so e.g. a chunk whose ISBNs are all plain digits would read them as numbers
+    dtypes = {column: 'object' for column in _ZOTERO_TEXT_COLUMNS}
+    dtypes.update({'Publication Year': 'Int64', 'Num Pages': 'Int64'})
+    chunks = pd.read_csv(csv_file, usecols=['Key','Item Type','Publication Year','Author', 'Title', 'Publication Title', 'ISBN',
+                                            'ISSN', 'DOI', 'Url', 'Abstract Note', 'Date', 'Pages', 'Num Pages', 'Issue', 'Volume',
+                                            'Series', 'Series Number', 'Publisher', 'Place', 'Rights', 'Notes', 'Manual Tags',
+                                            'Automatic Tags', 'Editor', 'Edition', 'Extra', 'Number', 'Conference Name'],
+                         dtype=dtypes, encoding='utf-8', engine='c', memory_map=True, chunksize=chunksize)
     columns_mapper = {'Key': 'id', 'Item Type': 'type', 'Author': 'creator', 'Publication Title': 'journal',
                       'Abstract Note': 'abstract', 'Series': 'relation', 'Place': 'place of publication',
                       'Pages': 'Pages Range', 'Num Pages':'pages'}
-    df = df.rename(columns=columns_mapper)
-    df['Series Number'] = df['Series Number'].mask(pd.isnull, df['Number'])
-    df['journal'] = df['journal'].mask(pd.isnull, df['Conference Name'])    # TODO: Make this conditional to 'Item Type'=conferencePaper
-    # df = df.replace(np.nan, "", regex=True)
-    df['subject'] = df['Manual Tags'] + "\n" + df['Automatic Tags']
-    df['notes'] = df['Notes'].astype(str) + "\n" + df['Extra'].astype(str) + "\n" + df['Rights'].astype(str) + "\n" + df['Conference Name'].astype(str)
-    df = df.drop(columns=['Notes', 'Rights', 'Manual Tags', 'Automatic Tags'])
-    df.columns = df.columns.str.lower()
-    allrows = df.to_dict(orient='records')
-    return allrows
+    for df in chunks:
+        df = df.rename(columns=columns_mapper)
+        df['Series Number'] = df['Series Number'].mask(pd.isnull, df['Number'])
+        df['journal'] = df['journal'].mask(pd.isnull, df['Conference Name'])    # TODO: Make this conditional to 'Item Type'=conferencePaper
+        df['subject'] = df['Manual Tags'] + "\n" + df['Automatic Tags']
+        df['notes'] = df['Notes'].astype(str) + "\n" + df['Extra'].astype(str) + "\n" + df['Rights'].astype(str) + "\n" + df['Conference Name'].astype(str)
+        df = df.drop(columns=['Notes', 'Rights', 'Manual Tags', 'Automatic Tags'])
+        df.columns = df.columns.str.lower()
+        # blank cells come through as None rather than nan, in one pass over the chunk
+        df = df.astype(object)
+        df = df.where(df.notna(), None)
+        yield from df.to_dict(orient='records')
 
 
 def reformat_author(research_id, authors: str) -> tuple:
@@ -128,201 +156,261 @@ def reformat_author(research_id, authors: str) -> tuple:
     return reformatted_authors, groups
 
 
+def parse_names(names) -> list:
+    """
+    Split a creator/editor field into a list of {"last_name", "first_name"} dicts.
+    Names are separated by || double pipes or ; semicolons. Returns an empty list when the field is blank.
+    """
+    if not isinstance(names, str):
+        return []
+    parts = names.split('||') if '||' in names else names.split(';')
+    authors = []
+    for name in parts:
+        if name.strip():
+            first_name, last_name = parse_author(name)
+            authors.append({"last_name": last_name, "first_name": first_name})
+    return authors
+
+
 def get_author_data(publication):
-    author_list = publication['creator']
-    if type(author_list) == str:
-        if "||" in str(author_list):
-            author_list = author_list.split('||')
-        else:
-            author_list = author_list.split(';')
-        these_authors = []
-        for author in author_list:
-            these_authors.append({"last_name": get_lastname(author),
-                                 "first_name":get_firstname(author)})
-        return these_authors
-    else:
-        return np.nan
+    return parse_names(publication['creator'])
+
 
 def get_editor_data(publication):
-    editor_list = publication['editor']
-    if type(editor_list) == str:
-        if "||" in str(editor_list):
-            editor_list = editor_list.split('||')
-        else:
-            editor_list = editor_list.split(';')
-        these_editors = []
-        for editor in editor_list:
-            these_editors.append({"last_name": get_lastname(editor),
-                                 "first_name":get_firstname(editor)})
-        return these_editors
+    return parse_names(publication['editor'])
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_author(author_name: str) -> tuple:
+    """
+    Split one "Last, First" or "Last, Suffix, First" name into (first, last) with a single split.
+    Results are cached, since the same authors recur across many publications in one CSV.
+
+    :param author_name: A single author/editor name
+    :return: A tuple of (first name, last name); first name is "" when the name has no comma
+    """
+    parts = author_name.split(',')
+    if len(parts) > 2:
+        return _MULTISPACE_RE.sub(' ', parts[2].strip()).title(), (parts[0] + ',' + parts[1]).strip().title()
+    elif len(parts) == 2:
+        return _MULTISPACE_RE.sub(' ', parts[1].strip()).title(), parts[0].strip().title()
     else:
-        return np.nan
+        return "", parts[0].strip().title()
 
 
 def get_lastname(author_name):
-    author_name = author_name.split(',')
-    last_name = author_name[0]
-    if len(author_name) > 2:
-        last_name = last_name + ',' + author_name[1]
-        return last_name.strip().title()
-    else:
-        return last_name.strip().title()
+    return parse_author(author_name)[1]
 
 
 def get_firstname(author_name):
-    author_name = author_name.split(',')
-    if len(author_name) > 2:
-        author_first = author_name[2].strip().title()
-        author_first = re.sub('\s\s+', ' ', author_first)
-        return author_first.strip().title()
-    elif len(author_name) == 2:
-        author_first = author_name[1].strip().title()
-        author_first = re.sub('\s\s+', ' ', author_first)
-        return author_first.strip().title()
-    else:
-        author_first = np.nan
-        return author_first
+    return parse_author(author_name)[0]
 
-def access_internal_persons(ip_file: str) -> pd.DataFrame:
+
+@functools.lru_cache(maxsize=4)
+def access_internal_persons(ip_file: str, cache: bool = True) -> pd.DataFrame:
     """
     Create DataFrame containing internal persons; read in last name, first name, Pure ID
+    Parsing the Excel export is slow, so the DataFrame is pickled next to it (ip_file + ".pkl") and reused by later runs
+    for as long as the pickle is newer than the Excel file and was written for the same columns and pandas version;
+    otherwise the Excel file is parsed again. Within one run, repeat calls for the same file return the
+    same DataFrame without reading anything; treat it as read-only.
+
     :param ip_file: Str reference to Pure - Internal Persons file against which to validate the list of authors in csv_data.
+    :param cache: Read and write the pickled copy of the DataFrame
     :return: DataFrame of internal_persons
     """
+    cache_file = ip_file + ".pkl"
+    if cache and os.path.isfile(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(ip_file):
+        df = _read_persons_cache(cache_file)
+        if df is not None:
+            return df
+
+    df = pd.read_excel(ip_file, sheet_name="Persons (0)_1", usecols=list(_PERSONS_COLUMNS))
+    df = df.rename(columns=_PERSONS_COLUMNS_MAPPER)
+    if cache:
+        try:
+            pd.to_pickle((_PERSONS_CACHE_TAG, df), cache_file)
+        except OSError:
+            # e.g. the persons file is in a read-only directory; just parse it again next run
+            pass
+    return df
+
 
-    df = pd.read_excel(ip_file, sheet_name="Persons (0)_1",
-                       usecols=["3 Last, first name", "4 Name > Last name", "5 Name > First name", "21 ID",
-                                "10.1 Organizations > Organizational unit[1]"])
-    columns_mapper = {'10.1 Organizations > Organizational unit[1]': 'unit'}
-    df = df.rename(columns=columns_mapper)
+def _read_persons_cache(cache_file: str):
+    # the cached DataFrame, or None if the pickle can't be read or was written for other columns or another pandas
+    try:
+        tag, df = pd.read_pickle(cache_file)
+    except Exception:
+        # a corrupt or truncated pickle, or one pandas can no longer load, can fail in many different ways
+        return None
+    expected_columns = {_PERSONS_COLUMNS_MAPPER.get(column, column) for column in _PERSONS_COLUMNS}
+    if tag != _PERSONS_CACHE_TAG or not isinstance(df, pd.DataFrame) or set(df.columns) != expected_columns:
+        return None
     return df
 
 
-def get_internal_external_authors(these_authors: list, internal_persons: pd.DataFrame, custom_ratio: int) -> tuple:
+def index_internal_persons(internal_persons: pd.DataFrame) -> dict:
+    """
+    Build a lookup of internal persons keyed on their "Last, first name" string. Build it once per run and pass it to
+    get_internal_external_authors, so exact name matches are a hash lookup instead of a scan of the whole DataFrame.
+
+    :param internal_persons: DataFrame returned by access_internal_persons
+    :return: Dictionary of {"Last, First": (Pure ID as a str, unit affiliation or None, number of internal persons with that name)}
+    """
+    persons_index = {}
+    for name, auth_id, unit_affiliation in zip(internal_persons["3 Last, first name"], internal_persons["21 ID"],
+                                               internal_persons["unit"]):
+        if not isinstance(name, str) or pd.isna(auth_id):
+            # a row without a name can't be matched, and one without a Pure ID can't be written
+            continue
+        if name in persons_index:
+            # Keep the first person with this name, but count the duplicates so they can be flagged
+            first_id, first_unit, count = persons_index[name]
+            persons_index[name] = (first_id, first_unit, count + 1)
+        else:
+            # stored as the string it is written out as, so writing an author needs no conversion; a blank unit
+            # cell is stored as None rather than nan
+            persons_index[name] = (str(int(auth_id)), unit_affiliation if isinstance(unit_affiliation, str) else None, 1)
+    return persons_index
+
+
+@dataclass
+class AuthorRecord:
+    """
+    One validated author or editor, as returned by get_internal_external_authors.
+    Authors not found in the Internal Persons file get an imported_person_ id, is_imported=True and
+    unit_affiliation None.
+    """
+    __slots__ = ('author_id', 'first_name', 'last_name', 'unit_affiliation', 'is_imported')
+    author_id: str
+    first_name: str
+    last_name: str
+    unit_affiliation: Optional[str]
+    is_imported: bool
+
+
+# fuzzy matches found so far for the persons_index they were found in; the same authors recur across many
+# publications in one CSV, so each distinct name is only scored against Internal Persons once per run
+_fuzzy_matches = {'persons_index': None, 'matches': {}}
+
+
+def match_internal_person(correct_string: str, persons_index: dict, custom_ratio: int):
+    """
+    Find the Internal Persons name matching one "Last, First" author string: an exact match if there is one, otherwise
+    the highest (first, on ties) fuzzy match scoring above custom_ratio. Fuzzy results are cached for the persons_index.
+
+    :param correct_string: Author name as "Last, First", or "Last" when there is no first name
+    :param persons_index: Output of index_internal_persons(internal_persons)
+    :param custom_ratio: Minimum fuzz ratio for a fuzzy match
+    :return: The matching key of persons_index, or None if no internal person matches
+    """
+    if correct_string in persons_index:
+        # Exact match
+        return correct_string
+    if _fuzzy_matches['persons_index'] is not persons_index:
+        _fuzzy_matches['persons_index'] = persons_index
+        _fuzzy_matches['matches'] = {}
+    key = (correct_string, custom_ratio)
+    if key not in _fuzzy_matches['matches']:
+        # rapidfuzz scores are unrounded, so a ratio rounding above custom_ratio means a score of custom_ratio + 0.5
+        best = process.extractOne(correct_string, persons_index.keys(), scorer=fuzz.ratio,
+                                  score_cutoff=custom_ratio + 0.5)
+        if best is not None:
+            _fuzzy_matches['matches'][key] = best[0]
+        else:
+            _fuzzy_matches['matches'][key] = None
+    return _fuzzy_matches['matches'][key]
+
+
+def get_internal_external_authors(these_authors: list, internal_persons: pd.DataFrame, custom_ratio: int,
+                                  persons_index: dict = None) -> list:
     """
     Read in list of 1+ reformatted authors (scope: 1 research output) and Internal Persons file.
     For each author in author_list,
-        Use fuzzy matching to compare author with all persons in Internal Persons.
-        Where a match is found, grab PureID and first Unit Affiliation; else, generate random ID and unit = np.nan.
+        Look up an exact name match in persons_index; otherwise use fuzzy matching to compare author with all persons in Internal Persons.
+        Where a match is found, grab PureID and first Unit Affiliation; else, generate random ID and unit = None.
     Add each author consecutively to new validated_authors list.
-    returns a dictionary containing a list of internal and external authors. use to process author data.
+    returns a list of AuthorRecords for the internal and external authors. use to process author data.
 
     NOTE: Beware of false matches where author names are very similar but represent different people. Set detailed_output=True for report.
+
+    :param persons_index: Output of index_internal_persons(internal_persons); built here if not supplied
     """
-    matches_log = []
+    if persons_index is None:
+        persons_index = index_internal_persons(internal_persons)
     validated_authors = []
-    external_authors = []
-    strings_to_check = internal_persons["3 Last, first name"].to_list()
 
     for this_author in these_authors:
-        correct_string =str(this_author["last_name"]) + ", " + str(this_author["first_name"])
-        ratios = []
-        for string in strings_to_check:
-            # Exact match
-            if string == correct_string:
-                ratios.append((string, 100))
-                break
-            else:
-                ratio = fuzz.ratio(string, correct_string)
-                if ratio > custom_ratio:
-                    ratios.append((string, ratio))
-        if len(ratios) == 1:
-            # Look up ratios[0] in df, return the ID of that match using .loc
-            select_row = internal_persons.loc[internal_persons["3 Last, first name"] == ratios[0][0]]
-            # TODO: Need to handle multiple authors with same name @ UIUC
-            auth_dupes = select_row.reset_index()
-            idx_len = auth_dupes.index.tolist()
-            if len(idx_len) > 1:
-                print("Warning! More than one UIUC faculty has the same name. Selecting the first author in list. You may want to fix this manually!")
-                auth_row_one = select_row.head(1)
-                auth_id = auth_row_one["21 ID"].item()
-                unit_affiliation = auth_row_one['unit'].item()
-            else:
-                auth_id = select_row["21 ID"].item()
-                unit_affiliation = select_row['unit'].item()
-            auth_id = int(auth_id)
-            matches_log.append((correct_string, ratios))
-        elif len(ratios) == 0:
+        if this_author["first_name"]:
+            correct_string = this_author["last_name"] + ", " + this_author["first_name"]
+        else:
+            correct_string = this_author["last_name"]
+        match = match_internal_person(correct_string, persons_index, custom_ratio)
+        if match is None:
             # Author not found in Internal Persons file - assign random ID
             auth_id = "imported_person_" + str(random.randrange(0, 1000000)) + str(random.randrange(0, 1000000))
-            unit_affiliation = np.nan
-            # external_authors.append(this_author)
+            unit_affiliation = None
         else:
-            # If more than 1 person from Internal Persons file matched, return highest match
-            ratios.sort(key=lambda x: x[1], reverse=True)
-            matches_log.append((correct_string, ratios))
-            # Use position within list to get back to the string, look up string in df to return ID using .loc
-            select_row = internal_persons.loc[internal_persons["3 Last, first name"] == ratios[0][0]]
-            # auth_id = select_row["21 ID"].item()
-            auth_id = select_row["21 ID"].tolist()[0]
-            auth_id = int(auth_id)
-            # unit_affiliation = select_row['unit'].item()
-            unit_affiliation = select_row['unit'].tolist()[0]
-        author_dict = {"author_id": auth_id, "author": this_author, "unit_affiliation": unit_affiliation}
-        validated_authors.append(author_dict)
-    #
-    #     if 'imported_person' in str(auth_id):
-    #         pass
-    #     else:
-    #         author_dict = {"author_id": auth_id, "author": this_author, "unit_affiliation": unit_affiliation}
-    #         validated_authors.append(author_dict)
-    # results_dict = {"internal_authors": validated_authors, "external_authors": external_authors}
-    #     # except TypeError:
-    #     #     print(author, 'author isnt a str; it is', type(author))
+            auth_id, unit_affiliation, same_name_count = persons_index[match]
+            # TODO: Need to handle multiple authors with same name @ UIUC
+            if same_name_count > 1:
+                print("Warning! More than one UIUC faculty has the same name. Selecting the first author in list. You may want to fix this manually!")
+        validated_authors.append(AuthorRecord(auth_id, this_author["first_name"], this_author["last_name"],
+                                              unit_affiliation, match is None))
     return validated_authors
 
 
+# Ordered (needles, any/all, type, subType) rules; the first rule whose needles match the lowercased type wins.
+_RESEARCH_OUTPUT_TYPES = (
+    (('booksection',), any, 'chapterInBook', 'chapter'),
+    (('book',), any, 'book', 'book'),
+    (('technical', 'report'), any, 'book', 'technical_report'),
+    (('other', 'conference'), all, 'contributionToConference', 'other'),
+    (('conference', 'proceeding'), any, 'chapterInBook', 'conference'),
+    (('journal',), any, 'contributionToJournal', 'article'),
+    (('magazine',), any, 'other', 'magazine_newspaper_essay'),
+    (('preprint',), any, 'workingPaper', 'preprint'),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _match_research_output_type(type_value: str) -> tuple:
+    """
+    Match a lowercased type value against _RESEARCH_OUTPUT_TYPES. A CSV only has a handful of distinct type values,
+    so the result is cached and every publication after the first of its type is a single dict lookup.
+
+    :return: Tuple of (type, subType), or None if no rule matches
+    """
+    for needles, match, output_type, sub_type in _RESEARCH_OUTPUT_TYPES:
+        if match(needle in type_value for needle in needles):
+            return output_type, sub_type
+    return None
+
+
 def get_research_output_type(publication) -> dict:
     """
     Determine research output type for 1 research output.
 
-    :param research_id: ID of research output
-    :param type_value: Contents of type column
+    :param publication: Dictionary of one research output's fields; the type column is matched against _RESEARCH_OUTPUT_TYPES
     :return: Dictionary w/ type and subtype e.g. {'type':'book','subType':'technical_report'}
     """
-    type_value = publication["type"]
-    research_output_type = {}
-    if 'booksection' in type_value.lower():
-        research_output_type['type'] = 'chapterInBook'
-        research_output_type['subType'] = 'chapter'
-    elif 'book' in type_value.lower():
-        research_output_type['type'] = 'book'
-        research_output_type['subType'] = 'book'
-    elif 'technical' in type_value.lower() or 'report' in type_value.lower():
-        research_output_type['type'] = 'book'
-        research_output_type['subType'] = 'technical_report'
-    elif 'other' in type_value.lower() and 'conference' in type_value.lower():
-        research_output_type['type'] = 'contributionToConference'
-        research_output_type['subType'] = 'other'
-    elif 'conference' in type_value.lower() or 'conferencepaper' in type_value.lower() or 'proceeding' in type_value.lower():
-        research_output_type['type'] = 'chapterInBook'
-        research_output_type['subType'] = 'conference'
-    elif 'journal' in type_value.lower() or 'journalarticle' in type_value.lower():
-        research_output_type['type'] = 'contributionToJournal'
-        research_output_type['subType'] = 'article'
-    elif 'magazine' in type_value.lower() or 'magazinearticle' in type_value.lower():
-        research_output_type['type'] = 'other'
-        research_output_type['subType'] = 'magazine_newspaper_essay'
-    elif 'preprint' in type_value.lower():
-        research_output_type['type'] = 'workingPaper'
-        research_output_type['subType'] = 'preprint'
-    elif 'presentation' in type_value.lower():
-        research_output_type['type'] = "ERROR"
-        research_output_type['subType'] = "ERROR"
-        print("Presentation research output type not yet supported. Manually enter this data. Check rows with IDs: {}\n".format(research_id))
+    type_value = publication["type"].lower()
+    matched = _match_research_output_type(type_value)
+    if matched is not None:
+        return {'type': matched[0], 'subType': matched[1]}
+    if 'presentation' in type_value:
+        print("Presentation research output type not yet supported. Manually enter this data. Check rows with IDs: {}\n".format(publication["id"]))
     else:
-        research_output_type['type'] = "ERROR"
-        research_output_type['subType'] = "ERROR"
         print("Error in technical report type. XML validation will fail. Check rows with IDs: {}\n".format(publication["id"]))
-    return research_output_type
+    return {'type': "ERROR", 'subType': "ERROR"}
 
 
 def get_publication_year(publication):
     year = publication["publication year"]
-    if type(year) == int:
+    if isinstance(year, int):
         return year
     else:
-        return np.nan
+        return None
 
 
 def get_title(publication):
@@ -331,33 +419,33 @@ def get_title(publication):
 
 def get_journal(publication):
     journal = publication["journal"]
-    if type(journal) == str:
+    if isinstance(journal, str):
         return journal
     else:
-        return np.nan
+        return None
 
 
 def get_isbn(publication):
     isbn = publication["isbn"]
-    if type(isbn) == str:
+    if isinstance(isbn, str):
         if re.match(r'^(?=(?:\D*\d){10}(?:(?:\D*\d){3})?$)[\d-]+$', isbn):
             return isbn
         else:
-            return np.nan
+            return None
     else:
         return isbn
 
 
-def get_issn(publication):
+def get_issns(publication) -> tuple:
+    """
+    Split the comma separated issn field, trimming the whitespace around each issn and dropping empty entries.
+
+    :return: A tuple of issns; empty when the record has none
+    """
     issn = publication["issn"]
-    cleaned_issns = []
-    if type(issn) == str:
-        these_issns = issn.split(',')
-        for this_issn in these_issns:
-            cleaned_issns.append(this_issn.strip())
-        return cleaned_issns
-    else:
-        return np.nan
+    if not isinstance(issn, str):
+        return ()
+    return tuple(this_issn.strip() for this_issn in issn.split(',') if this_issn.strip())
 
 
 def get_doi(publication):
@@ -368,6 +456,25 @@ def get_url(publication):
     return publication["url"]
 
 
+def get_urls(publication) -> tuple:
+    """
+    Split the url field on semicolons, trimming the whitespace around each url and dropping empty entries.
+
+    :return: A tuple of urls; empty when the record has none
+    """
+    url = publication["url"]
+    if not isinstance(url, str):
+        return ()
+    url = url.strip()
+    if ';' not in url:
+        # most records have a single url, which needs no split
+        if url:
+            return (url,)
+        else:
+            return ()
+    return tuple(this_url for this_url in _URL_SEPARATOR_RE.split(url) if this_url)
+
+
 def get_abstract(publication):
     return publication["abstract"]
 
@@ -375,43 +482,43 @@ def get_abstract(publication):
 
 def get_pages_range(publication):
     page_range = publication["pages range"]
-    if type(page_range) == str:
+    if isinstance(page_range, str):
         if re.match(r'\d+-\d+', page_range):
             return page_range
         else:
-            return np.nan
+            return None
     else:
         return page_range
 
 
 def get_number_pages(publication):
     number_pages = publication["pages"]
-    if type(number_pages) == str:
+    if isinstance(number_pages, str):
         if re.match(r'\d+', number_pages):
             return number_pages
         else:
-            return np.nan
+            return None
     else:
         return number_pages
 
 
 def get_issue(publication):
     issue = publication["issue"]
-    if type(issue) == str:
+    if isinstance(issue, str):
         return issue
     else:
-        return np.nan
+        return None
 
 
 def get_volume(publication):
     vol = publication["volume"]
-    if type(vol) == str:
+    if isinstance(vol, str):
         if bool(re.search(r'([^0-9])', vol)):
-            return np.nan
+            return None
         else:
             return vol
     else:
-        return np.nan
+        return None
 
 
 def get_relation(publication):
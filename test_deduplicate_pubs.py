@@ -0,0 +1,11 @@
+from deduplicate_pubs import deduper
+
+
+def test_deduper_only_reads_seen_dois():
+    # deduper reports a doi that was already written, but leaves adding dois to the caller. thesis isn't a type
+    # deduper searches pure for, so neither record needs the api
+    seen_dois = {'10.1000/xyz'}
+    assert not deduper({'id': 'C1', 'type': 'thesis', 'doi': 'https://doi.org/10.1000/NEW'}, seen_dois)
+    assert seen_dois == {'10.1000/xyz'}
+    assert deduper({'id': 'C2', 'type': 'thesis', 'doi': 'doi:10.1000/XYZ'}, seen_dois)
+    assert seen_dois == {'10.1000/xyz'}
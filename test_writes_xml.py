@@ -0,0 +1,19 @@
+import io
+
+from writes_xml import write_fragments
+
+
+def test_write_fragments_adds_doi_once_written():
+    # a doi only counts as seen once a record with it is written: a malformed first copy is reported as malformed,
+    # the next well-formed copy is written, and only copies after that are duplicates
+    outfile = io.BytesIO()
+    seen_dois = set()
+    malformed_records = []
+    duplicate_records = []
+    fragments = [('A1', '10.1000/xyz', None), ('A2', '10.1000/xyz', b'<a2/>\n'), ('A3', '10.1000/xyz', b'<a3/>\n'),
+                 ('B1', None, b'<b1/>\n'), ('B2', None, b'<b2/>\n')]
+    assert write_fragments(outfile, fragments, seen_dois, malformed_records, duplicate_records) == 3
+    assert malformed_records == ['A1']
+    assert duplicate_records == ['A3']
+    assert outfile.getvalue() == b'<a2/>\n<b1/>\n<b2/>\n'
+    assert seen_dois == {'10.1000/xyz'}
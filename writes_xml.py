@@ -1,11 +1,18 @@
-import xml.etree.ElementTree as et
+from lxml import etree as et
 import process_metadata as pm
-from deduplicate_pubs import deduper
+from deduplicate_pubs import deduper, normalize_doi
+from concurrent.futures import ProcessPoolExecutor
+import collections
+import contextlib
+import copy
+import itertools
 import os
+import random
+import sys
 # DEPENDENCIES:
-# dependent external libraries: os, csv, json, requests, numpy, Leveshetin, pandas, ElementTree
+# dependent external libraries: os, csv, json, requests, rapidfuzz, pandas, lxml
 # dependent internal libraries: deduplicate_pubs.py (uses resquests and json)
-# process_metadata.py (uses csv, numpy, pandas, and Leveshetin), and api_keys.py (contains pure api keys)
+# process_metadata.py (uses csv, pandas, and rapidfuzz), and api_keys.py (contains pure api keys)
 
 # USAGE INSTRUCTIONS:
 # INPUT: csv file with research output records, excel file of internal people downloaded from pure
@@ -13,65 +20,100 @@ import os
 # USE: automatically generate an xml file from a csv file for bulk uploading research output types
 # chapter, conference paper, journal article, book, technical report, preprint, magazine article,
 # and blog post into Experts
-
-
-def main():
+# RUN: python writes_xml.py [csv file] [xml file name] [pure persons file]
+
+# the pure import schema puts records in the default namespace and localized text/dates in the tns namespace
+PURE_NS = "v1.publication-import.base-uk.pure.atira.dk"
+TNS_NS = "v3.commons.pure.atira.dk"
+NSMAP = {None: PURE_NS, 'tns': TNS_NS}
+TNS_NSMAP = {'tns': TNS_NS}
+TNS = '{%s}' % TNS_NS
+# clark-notation tags for the tns elements the writers use, built once
+TNS_YEAR = TNS + 'year'
+TNS_TEXT = TNS + 'text'
+OUTFILE_BUFFER_SIZE = 1 << 20
+FLUSH_EVERY = 1000
+# records handed to a worker process per task
+WORKER_BATCH_SIZE = 64
+# the publications wrapper is written as literal bytes around the per-record fragments, one record per line
+XML_HEAD = ('<?xml version="1.0" encoding="UTF-8"?>\n<publications xmlns="%s" xmlns:tns="%s">\n' % (PURE_NS, TNS_NS)).encode('utf-8')
+XML_TAIL = b'</publications>\n'
+# pure id of the prairie research institute, which owns every record
+PRI_ORG_ID = '3022427'
+# lowest fuzz ratio at which an author name is taken to match an internal person
+AUTHOR_MATCH_RATIO = 79
+
+
+def main(workers=os.cpu_count()):
     print('Welcome to write_xml.py, a program ingests a csv file of research output records to be bulk uploaoded to Illinois Experts.')
-    csv_file_name = input('Enter the complete path to the csv file you would like to process: ')
+    # paths can be given on the command line as: writes_xml.py <csv file> <xml file name> <pure persons file>,
+    # anything not given is asked for
+    args = sys.argv[1:]
+    if len(args) > 0:
+        csv_file_name = args[0]
+    else:
+        csv_file_name = input('Enter the complete path to the csv file you would like to process: ')
     while not os.path.isfile(csv_file_name) and csv_file_name != 'quit':
         csv_file_name = input('You did not enter a valid file path. Please enter the complete path to the csv file to continue, or enter \'quit\' to cancel the program: ')
     publications = pm.load_zotero_csv(csv_file_name)
-    outfile_name = str(input('Enter the name for the xml file: ')) + '.xml'
-    internal_persons = pm.access_internal_persons("/Users/elizabethschwartz/Documents/assistantships/scp/pri_import/pri_csv_to_xml_v1/data/Pure persons - 92322.xls")
-    root = et.Element('publications')
-    tree = et.ElementTree(root)
-    root.set('xmlns', "v1.publication-import.base-uk.pure.atira.dk")
-    root.set('xmlns:tns', "v3.commons.pure.atira.dk")
-    outfile = open(outfile_name, 'wb')
+    if len(args) > 1:
+        outfile_name = args[1] + '.xml'
+    else:
+        outfile_name = str(input('Enter the name for the xml file: ')) + '.xml'
+    if len(args) > 2:
+        persons_file_name = args[2]
+    else:
+        persons_file_name = input('Enter the complete path to the Pure persons file: ')
+    while not os.path.isfile(persons_file_name):
+        persons_file_name = input('You did not enter a valid file path. Please enter the complete path to the Pure persons file: ')
+    internal_persons = pm.access_internal_persons(persons_file_name)
+    # index the internal persons once so author matching doesn't rescan the DataFrame for every publication
+    persons_index = pm.index_internal_persons(internal_persons)
     malformed_records = []
     duplicate_records = []
-    for publication in publications:
-        if deduper(publication):
-            duplicate_records.append(publication)
-        else:
+    unsupported_records = []
+    counts = {'total': 0}
+    seen_dois = set()
+
+    # dedup (which calls the pure api and checks the dois written so far) and type lookup stay in this process;
+    # only the records that will actually be written are handed on to be serialized
+    def records_to_serialize():
+        for publication in publications:
+            counts['total'] += 1
+            if deduper(publication, seen_dois):
+                duplicate_records.append(pm.get_id(publication))
+                continue
             setting = pm.get_research_output_type(publication)
-            if setting['subType'] == 'chapterInBook':
-                record = write_chapterInBook_xml(publication, root, setting, internal_persons)
-                if record is not None:
-                    malformed_records.append(record['id'])
-            elif setting['subType'] == 'conference':
-                record = write_conferencePaper_xml(publication, root, setting, internal_persons)
-                if record is not None:
-                    malformed_records.append(record['id'])
-            elif setting['subType'] == 'article':
-                record = write_journal_article_xml(publication, root, setting, internal_persons)
-                if record is not None:
-                    malformed_records.append(record['id'])
-            elif setting['subType'] == 'technical_report':
-                record = write_tech_report_xml(publication, root, setting, internal_persons)
-                if record is not None:
-                    malformed_records.append(record['id'])
-            elif setting['subType'] == 'preprint':
-                record = write_preprint_xml(publication, root, setting, internal_persons)
-                if record is not None:
-                    malformed_records.append(record['id'])
-            elif setting['subType'] == 'book':
-                record = write_book_xml(publication, root, setting, internal_persons)
-                if record != None:
-                    malformed_records.append(record['id'])
-            elif setting['subType'] == 'magazine_newspaper_essay':
-                record = write_magazine_article_xml(publication, root, setting, internal_persons)
-                if record is not None:
-                    malformed_records.append(record['id'])
-            else:
-                print(publication['type'])
-                print(setting)
-                print('Unsupported subtype.')
-    tree.write(outfile)
-    print('Attempted to write', len(publications), 'research outputs to xml.')
-    print(str(len(malformed_records)) + '/' + str(len(publications)),'of these were not written to xml because they are missing required fields.')
-    print(str(len(duplicate_records)) + '/' + str(len(publications)), 'of these were not written to xml because they are already in Experts.')
-    print(len(publications) - len(malformed_records) - len(duplicate_records), 'total records were written to xml successfully.')
+            if setting['subType'] not in WRITERS:
+                print('Unsupported type', publication['type'], 'for the record with id,', pm.get_id(publication) + '. It was not written to xml.')
+                unsupported_records.append(pm.get_id(publication))
+                continue
+            yield publication, setting
+
+    # each record is serialized to its own bytes fragment, so the fragments can be built in parallel
+    # and concatenated between the opening and closing publications tags. the large buffer batches
+    # those small per-record writes into few write() calls, and it is flushed every FLUSH_EVERY records
+    # so a long run that fails part way still leaves everything written so far on disk
+    if workers and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(internal_persons, persons_index))
+    else:
+        executor = contextlib.nullcontext()
+        _init_worker(internal_persons, persons_index)
+    with open(outfile_name, 'wb', buffering=OUTFILE_BUFFER_SIZE) as outfile, executor:
+        outfile.write(XML_HEAD)
+        if workers and workers > 1:
+            fragments = _ordered_map(executor, _serialize_record, records_to_serialize(), WORKER_BATCH_SIZE, workers * 2)
+        else:
+            fragments = map(_serialize_record, records_to_serialize())
+        write_fragments(outfile, fragments, seen_dois, malformed_records, duplicate_records)
+        outfile.write(XML_TAIL)
+    total_records = counts['total']
+    print('Attempted to write', total_records, 'research outputs to xml.')
+    print(str(len(malformed_records)) + '/' + str(total_records),'of these were not written to xml because they are missing required fields.')
+    print(str(len(duplicate_records)) + '/' + str(total_records), 'of these were not written to xml because they are already in Experts or repeat a DOI earlier in the csv.')
+    print(str(len(unsupported_records)) + '/' + str(total_records), 'of these were not written to xml because their type is not supported.')
+    print(total_records - len(malformed_records) - len(duplicate_records) - len(unsupported_records), 'total records were written to xml successfully.')
     if len(malformed_records) != 0:
         print('Correct the malformed records with the following ids, and rerun the program to include them in the xml file for bulk upload.')
         print(malformed_records)
@@ -79,1073 +121,555 @@ def main():
         print('Proceed to Experts to bulk upload the file,', outfile_name)
 
 
-def write_magazine_article_xml(publication, root, setting, internal_persons):
-    if (type(pm.get_publication_year(publication)) == int) and (type(pm.get_title(publication)) == str):
-        mag_article = et.SubElement(root, 'other')
-        mag_article.set('id', pm.get_id(publication))
-        mag_article.set('subType', setting['subType'])
-        peer_review = et.SubElement(mag_article, 'peerReviewed')
-        peer_review.text = 'false'
-        # publication status stuff!
-        pub_statuses = et.SubElement(mag_article, 'publicationStatuses')
-        pub_status = et.SubElement(pub_statuses, 'publicationStatus')
-        status_type = et.SubElement(pub_status, 'statusType')
-        status_type.text = 'published'
-        date = et.SubElement(pub_status, 'date')
-        the_year = et.SubElement(date, 'tns:year')
-        if type(pm.get_publication_year(publication)) != float:
-            the_year.text = str(pm.get_publication_year(publication))
-        else:
-            print('research output', pm.get_id(publication), 'is missing required year field. upload will fail.')
-        # language
-        language = et.SubElement(mag_article, 'language')
-        language.text = 'en_US'
-        # title
-        title = et.SubElement(mag_article, 'title')
-        title_text = et.SubElement(title, 'tns:text')
-        title_text.set('lang', 'en')
-        title_text.set('country', 'US')
-        title_text.text = pm.get_title(publication)
-    #     abstract
-        if type(pm.get_abstract(publication)) == str:
-            abstract = et.SubElement(mag_article, 'abstract')
-            abstract_text = et.SubElement(abstract, 'tns:text')
-            abstract_text.set('lang', 'en')
-            abstract_text.set('country', 'US')
-            abstract_text.text = pm.get_abstract(publication)
-        else:
-            pass
+# internal persons are handed to each worker process once, when it starts, instead of being pickled with every record
+_worker_persons = {}
+
+
+def _init_worker(internal_persons, persons_index):
+    _worker_persons['internal_persons'] = internal_persons
+    _worker_persons['persons_index'] = persons_index
+    # forked workers inherit the parent's random state, so reseed or they would hand out the same imported_person ids
+    random.seed()
+
+
+def _serialize_record(job):
+    # returns (id, normalized doi, the record's bytes or None if it is malformed)
+    publication, setting = job
+    record = WRITERS[setting['subType']](publication, setting, _worker_persons['internal_persons'], _worker_persons['persons_index'])
+    doi = normalize_doi(pm.get_doi(publication))
+    if record is None:
+        return pm.get_id(publication), doi, None
+    else:
+        record.tail = '\n'
+        return pm.get_id(publication), doi, et.tostring(record, encoding='utf-8')
+
+
+def write_fragments(outfile, fragments, seen_dois, malformed_records, duplicate_records):
+    # write the serialized records in csv order. a doi is added to seen_dois only once its record is written, so a
+    # malformed first copy of a doi doesn't turn a later, well-formed copy into a duplicate. copies close together in
+    # the csv can both get past deduper before either is written, so the doi is checked again here
+    written = 0
+    for pub_id, doi, fragment in fragments:
+        if fragment is None:
+            malformed_records.append(pub_id)
+        elif doi is not None and doi in seen_dois:
+            duplicate_records.append(pub_id)
+        else:
+            outfile.write(fragment)
+            if doi is not None:
+                seen_dois.add(doi)
+            written += 1
+            if written % FLUSH_EVERY == 0:
+                outfile.flush()
+    return written
+
+
+def _map_batch(fn, batch):
+    return [fn(job) for job in batch]
+
+
+def _ordered_map(executor, fn, jobs, batch_size, window):
+    # like executor.map(fn, jobs, chunksize=batch_size): jobs are sent to the workers batch_size at a time to cut
+    # down on pickling round trips, but only window batches are in flight so the csv is still read as it is consumed
+    jobs = iter(jobs)
+    pending = collections.deque()
+    while True:
+        batch = list(itertools.islice(jobs, batch_size))
+        if not batch:
+            break
+        pending.append(executor.submit(_map_batch, fn, batch))
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def append_publication_status(parent, pub_year, status='published'):
+    pub_statuses = et.SubElement(parent, 'publicationStatuses')
+    pub_status = et.SubElement(pub_statuses, 'publicationStatus')
+    text_element(pub_status, 'statusType', status)
+    date = et.SubElement(pub_status, 'date')
+    the_year = et.SubElement(date, TNS_YEAR)
+    if pub_year is not None:
+        the_year.text = str(pub_year)
+
+
+def append_language(parent):
+    text_element(parent, 'language', 'en_US')
+
+
+def append_authors(persons, author_data, internal_persons, persons_index):
+    # match the record's authors against internal persons and write each one
+    for an_author in pm.get_internal_external_authors(author_data, internal_persons, AUTHOR_MATCH_RATIO, persons_index):
+        append_author(persons, an_author)
+
+
+def append_author(persons, an_author):
+    # write one AuthorRecord. imported authors get a new random id on every record, so they are built each time;
+    # internal authors recur across many records, so each is built once per process and copied after that
+    if an_author.is_imported:
+        persons.append(_build_author(an_author))
+    else:
+        key = (an_author.author_id, an_author.first_name, an_author.last_name, an_author.unit_affiliation)
+        subtree = _author_subtrees.get(key)
+        if subtree is None:
+            subtree = _author_subtrees[key] = _build_author(an_author)
+        persons.append(copy.deepcopy(subtree))
+
+
+def _build_author(an_author):
+    # internal authors also get their unit as an organisation. the tns prefix is declared here so the unit name's
+    # tns:text keeps it; the declaration is dropped again once the author is appended to a record
+    this_author = et.Element('author', nsmap=TNS_NSMAP)
+    text_element(this_author, 'role', 'author')
+    this_person = et.SubElement(this_author, 'person')
+    this_person.set('id', an_author.author_id)
+    if an_author.first_name:
+        text_element(this_person, 'firstName', an_author.first_name)
+    text_element(this_person, 'lastName', an_author.last_name)
+    if isinstance(an_author.unit_affiliation, str) and not an_author.is_imported:
+        organizations = et.SubElement(this_author, 'organisations')
+        organization = et.SubElement(organizations, 'organisation')
+        localized_text(organization, 'name', an_author.unit_affiliation, lang=None, country=None)
+    return this_author
+
+
+def append_pri_owner(parent):
+    # pri is both the managing organisation and the owner of every record
+    parent.append(copy.deepcopy(PRI_ORGANISATIONS))
+    parent.append(copy.deepcopy(PRI_OWNER))
+
+
+def append_urls(parent, these_urls):
+    if these_urls:
+        urls = et.SubElement(parent, 'urls')
+        for this_url in these_urls:
+            url = et.SubElement(urls, 'url')
+            text_element(url, 'url', this_url)
+            localized_text(url, 'description', 'Other Link', lang=None, country=None)
+            text_element(url, 'type', 'unspecified')
+
+
+def append_doi(parent, doi, public_access_value='unknown', electronic_versions=False):
+    # some record types take the doi bare, others wrapped in an electronicVersions element
+    if isinstance(doi, str):
+        if electronic_versions:
+            parent = et.SubElement(parent, 'electronicVersions')
+        electronic_version_doi = et.SubElement(parent, 'electronicVersionDOI')
+        text_element(electronic_version_doi, 'version', "publishersversion")
+        # licence = et.SubElement(electronic_version_doi, 'licence')
+        text_element(electronic_version_doi, 'publicAccess', public_access_value)
+        text_element(electronic_version_doi, 'doi', doi)
+
+
+def append_pages(parent, pages_range, num_pages):
+    append_text(parent, 'pages', pages_range)
+    append_text(parent, 'numberOfPages', num_pages)
+
+
+def append_series(parent, volume_value, issue_value, these_issns):
+    # a series is written when there is a volume or an issn; the number (issue) only goes with a volume.
+    # a serie takes a single printIssn, so only the first issn is used
+    if isinstance(volume_value, str) or these_issns:
+        series = et.SubElement(parent, 'series')
+        this_series = et.SubElement(series, 'serie')
+        if isinstance(volume_value, str):
+            append_text(this_series, 'volume', volume_value)
+            append_text(this_series, 'number', issue_value)
+        if these_issns:
+            text_element(this_series, 'printIssn', these_issns[0])
+
+
+def append_text(parent, path, value):
+    # write value as the text of the element at path (a tag, or nested tags like 'publisher/name') under parent.
+    # optional fields are None when missing, so nothing is written unless value is a string
+    if isinstance(value, str):
+        *wrappers, tag = path.split('/')
+        for wrapper in wrappers:
+            parent = et.SubElement(parent, wrapper)
+        text_element(parent, tag, value)
+
+
+def text_element(parent, tag, text):
+    # a child element and its text in one call
+    element = et.SubElement(parent, tag)
+    element.text = text
+    return element
+
+
+def localized_text(parent, tag, text, lang='en', country='US'):
+    # pure wraps titles, abstracts and names in a tns:text element; pass lang/country as None to leave them off
+    element = et.SubElement(parent, tag)
+    localized = text_element(element, TNS_TEXT, text)
+    if lang:
+        localized.set('lang', lang)
+    if country:
+        localized.set('country', country)
+    return element
+
+
+def _build_record_skeleton(tag, peer_reviewed, status='published'):
+    # the parts of a record that are the same for every publication of its type: peerReviewed, the
+    # publicationStatus (its tns:year is left empty for new_record to fill in with the record's year) and language
+    record = et.Element(tag, nsmap=TNS_NSMAP)
+    text_element(record, 'peerReviewed', peer_reviewed)
+    append_publication_status(record, None, status)
+    append_language(record)
+    return record
+
+
+def _build_pri_organisations():
+    the_organizations = et.Element('organisations')
+    the_organization = et.SubElement(the_organizations, 'organisation')
+    the_organization.set('id', PRI_ORG_ID)
+    return the_organizations
+
+
+def _build_pri_owner():
+    owner = et.Element('owner')
+    owner.set('id', PRI_ORG_ID)
+    return owner
+
+
+# built once and deep-copied into each record by new_record
+JOURNAL_SKELETON = _build_record_skeleton('contributionToJournal', 'true')
+CONFERENCE_SKELETON = _build_record_skeleton('chapterInBook', 'false')
+CHAPTER_SKELETON = _build_record_skeleton('chapterInBook', 'true')
+MAGAZINE_SKELETON = _build_record_skeleton('other', 'false')
+BOOK_SKELETON = _build_record_skeleton('book', 'true')
+PREPRINT_SKELETON = _build_record_skeleton('workingPaper', 'false', 'inprep')
+TECH_REPORT_SKELETON = _build_record_skeleton('book', 'false')
+PRI_ORGANISATIONS = _build_pri_organisations()
+PRI_OWNER = _build_pri_owner()
+# internal author subtrees built so far by append_author, keyed on (id, first name, last name, unit)
+_author_subtrees = {}
+
+
+def new_record(skeleton, pub_id, sub_type, pub_year):
+    # copy a record skeleton and fill in the per-record values it was built without
+    record = copy.deepcopy(skeleton)
+    record.set('id', pub_id)
+    record.set('subType', sub_type)
+    record.find('.//' + TNS_YEAR).text = str(pub_year)
+    return record
+
+
+def start_record(skeleton, pub_id, sub_type, pub_year, pub_title, abstract_value):
+    # the start every record type shares: the skeleton, title, abstract (if any) and an empty persons element
+    # for the writer to fill. returns the record and its persons element
+    record = new_record(skeleton, pub_id, sub_type, pub_year)
+    localized_text(record, 'title', pub_title)
+    if isinstance(abstract_value, str):
+        localized_text(record, 'abstract', abstract_value)
+    persons = et.SubElement(record, 'persons')
+    return record, persons
+
+
+def write_magazine_article_xml(publication, setting, internal_persons, persons_index=None):
+    # look up each field once; the checks below reuse these locals
+    pub_id = pm.get_id(publication)
+    pub_year = pm.get_publication_year(publication)
+    pub_title = pm.get_title(publication)
+    journal = pm.get_journal(publication)
+    abstract_value = pm.get_abstract(publication)
+    these_urls = pm.get_urls(publication)
+    doi = pm.get_doi(publication)
+    pages_range = pm.get_pages_range(publication)
+    num_pages = pm.get_number_pages(publication)
+    volume_value = pm.get_volume(publication)
+    these_issns = pm.get_issns(publication)
+    author_data = pm.get_author_data(publication)
+    if isinstance(pub_year, int) and isinstance(pub_title, str):
+        mag_article, persons = start_record(MAGAZINE_SKELETON, pub_id, setting['subType'], pub_year, pub_title, abstract_value)
         # authors
-        persons = et.SubElement(mag_article, 'persons')
-        if type(pm.get_author_data(publication)) != float:
-            the_authors = pm.get_internal_external_authors(pm.get_author_data(publication), internal_persons, 79)
-            for an_author in the_authors:
-                this_author = et.SubElement(persons, 'author')
-                role = et.SubElement(this_author, 'role')
-                role.text = 'author'
-                this_person = et.SubElement(this_author, 'person')
-                this_person.set('id', str(an_author['author_id']))
-                first_name = et.SubElement(this_person, 'firstName')
-                first_name.text = an_author['author']['first_name']
-                last_name = et.SubElement(this_person, 'lastName')
-                last_name.text = an_author['author']['last_name']
-                if type(an_author['unit_affiliation']) == str:
-                    if 'imported' in str(an_author['author_id']):
-                        pass
-                    else:
-                        organizations = et.SubElement(this_author, 'organisations')
-                        organization = et.SubElement(organizations, 'organisation')
-                        org_name = et.SubElement(organization, 'name')
-                        org_name_text = et.SubElement(org_name, 'tns:text')
-                        org_name_text.text = an_author['unit_affiliation']
-                else:
-                    pass
-        else:
-            pass
-        the_organizations = et.SubElement(mag_article, 'organisations')
-        the_organization = et.SubElement(the_organizations, 'organisation')
-        the_organization.set('id', '3022427')
-        owner = et.SubElement(mag_article, 'owner')
-        owner.set('id', '3022427')
-
-        if type(pm.get_url(publication)) == str:
-            these_urls = pm.get_url(publication).split(';')
-            urls = et.SubElement(mag_article, 'urls')
-            # this has split the urls into letters :(
-            for this_url in these_urls:
-                url = et.SubElement(urls, 'url')
-                a_url = et.SubElement(url, 'url')
-                a_url.text = this_url
-                description = et.SubElement(url, 'description')
-                description_text = et.SubElement(description, 'tns:text')
-                description_text.text = 'Other Link'
-                url_type = et.SubElement(url, 'type')
-                url_type.text = 'unspecified'
-        else:
-            print(pm.get_url(publication))
-
-        if type(pm.get_doi(publication)) == str:
-            electronic_version_doi = et.SubElement(mag_article, 'electronicVersionDOI')
-            doi_version = et.SubElement(electronic_version_doi, 'version')
-            doi_version.text = "publishersversion"
-            # licence = et.SubElement(electronic_version_doi, 'licence')
-            public_access = et.SubElement(electronic_version_doi, 'publicAccess')
-            public_access.text = 'unknown'
-            the_doi = et.SubElement(electronic_version_doi, 'doi')
-            the_doi.text = str(pm.get_doi(publication))
-        else:
-            pass
+        if author_data:
+            append_authors(persons, author_data, internal_persons, persons_index)
+        append_pri_owner(mag_article)
+
+        append_urls(mag_article, these_urls)
+
+        append_doi(mag_article, doi)
 
         # setting page ranges and number of pages
-        if type(pm.get_pages_range(publication)) == str:
-            the_pages = et.SubElement(mag_article, 'pages')
-            the_pages.text = pm.get_pages_range(publication)
-        else:
-            pass
-        if type(pm.get_number_pages(publication)) == str:
-            number_pages = et.SubElement(mag_article, 'numberOfPages')
-            number_pages.text = pm.get_number_pages(publication)
-        else:
-            pass
-            # setting host publisher
-        if type(pm.get_journal(publication)) == str:
+        append_pages(mag_article, pages_range, num_pages)
+        # setting host publisher
+        if isinstance(journal, str):
             publisher = et.SubElement(mag_article, 'publisher')
-            publisher_name = et.SubElement(publisher, 'name')
-            publisher_name.text = pm.get_journal(publication)
-        else:
-            pass
-        if type(pm.get_volume(publication)) == str and type(pm.get_issn(publication)) == str:
-             volume = et.SubElement(publisher, 'volume')
-             volume.text = pm.get_volume(publication)
-        else: pass
-        if type(pm.get_issn(publication)) == str:
-            issn = et.SubElement(publisher, 'printIssn')
-            issn.text = pm.get_issn(publication)
+            text_element(publisher, 'name', journal)
+            if isinstance(volume_value, str) and these_issns:
+                text_element(publisher, 'volume', volume_value)
+            if these_issns:
+                text_element(publisher, 'printIssn', these_issns[0])
+        return mag_article
     else:
-        return publication
-
-
-def write_book_xml(publication, root, setting, internal_persons):
-    if (type(pm.get_publication_year(publication)) == int) and (type(pm.get_title(publication)) == str):
-        book = et.SubElement(root, "book")
-        book.set('id', pm.get_id(publication))
-        book.set('subType', setting['subType'])
-        peer_review = et.SubElement(book, 'peerReviewed')
-        peer_review.text = 'true'
-        # pub status stuff
-        pub_statuses = et.SubElement(book, 'publicationStatuses')
-        pub_status = et.SubElement(pub_statuses, 'publicationStatus')
-        status_type = et.SubElement(pub_status, 'statusType')
-        status_type.text = 'published'
-        date = et.SubElement(pub_status, 'date')
-        the_year = et.SubElement(date, 'tns:year')
-        if type(pm.get_publication_year(publication)) != float:
-            the_year.text = str(pm.get_publication_year(publication))
-        else:
-            print('research output', pm.get_id(publication), 'is missing required year field. upload will fail.')
-        # language
-        language = et.SubElement(book, 'language')
-        language.text = 'en_US'
-        # title
-        title = et.SubElement(book, 'title')
-        title_text = et.SubElement(title, 'tns:text')
-        title_text.set('lang', 'en')
-        title_text.set('country', 'US')
-        title_text.text = pm.get_title(publication)
-        # abstract
-        if type(pm.get_abstract(publication)) == str:
-            abstract = et.SubElement(book, 'abstract')
-            abstract_text = et.SubElement(abstract, 'tns:text')
-            abstract_text.set('lang', 'en')
-            abstract_text.set('country', 'US')
-            abstract_text.text = pm.get_abstract(publication)
-        else:
-            pass
-        persons = et.SubElement(book, 'persons')
-        if type(pm.get_author_data(publication)) != float:
-            the_authors = pm.get_internal_external_authors(pm.get_author_data(publication), internal_persons, 79)
+        return None
+
+
+def write_book_xml(publication, setting, internal_persons, persons_index=None):
+    # look up each field once; the checks below reuse these locals
+    pub_id = pm.get_id(publication)
+    pub_year = pm.get_publication_year(publication)
+    pub_title = pm.get_title(publication)
+    abstract_value = pm.get_abstract(publication)
+    these_urls = pm.get_urls(publication)
+    doi = pm.get_doi(publication)
+    pages_range = pm.get_pages_range(publication)
+    num_pages = pm.get_number_pages(publication)
+    isbn_value = pm.get_isbn(publication)
+    publisher_value = pm.get_publisher(publication)
+    volume_value = pm.get_volume(publication)
+    issue_value = pm.get_issue(publication)
+    these_issns = pm.get_issns(publication)
+    author_data = pm.get_author_data(publication)
+    editor_data = pm.get_editor_data(publication)
+    if isinstance(pub_year, int) and isinstance(pub_title, str):
+        book, persons = start_record(BOOK_SKELETON, pub_id, setting['subType'], pub_year, pub_title, abstract_value)
+        if author_data:
+            the_authors = pm.get_internal_external_authors(author_data, internal_persons, AUTHOR_MATCH_RATIO, persons_index)
             for an_author in the_authors:
-                if type(an_author['author']['last_name']) != float:
-                    this_author = et.SubElement(persons, 'author')
-                    role = et.SubElement(this_author, 'role')
-                    role.text = 'author'
-                    this_person = et.SubElement(this_author, 'person')
-                    this_person.set('id', str(an_author['author_id']))
-                    first_name = et.SubElement(this_person, 'firstName')
-                    first_name.text = an_author['author']['first_name']
-                    last_name = et.SubElement(this_person, 'lastName')
-                    last_name.text = an_author['author']['last_name']
-                    if type(an_author['unit_affiliation']) == str:
-                        if 'imported' in str(an_author['author_id']):
-                            pass
-                        else:
-                            organizations = et.SubElement(this_author, 'organisations')
-                            organization = et.SubElement(organizations, 'organisation')
-                            org_name = et.SubElement(organization, 'name')
-                            org_name_text = et.SubElement(org_name, 'tns:text')
-                            org_name_text.text = an_author['unit_affiliation']
-                    else: pass
-                else: pass
-        elif type(pm.get_editor_data(publication)) != float:
-            the_editors = pm.get_internal_external_authors(pm.get_editor_data(publication), internal_persons, 79)
+                if an_author.last_name:
+                    append_author(persons, an_author)
+        elif editor_data:
+            the_editors = pm.get_internal_external_authors(editor_data, internal_persons, AUTHOR_MATCH_RATIO, persons_index)
             for an_editor in the_editors:
-                if type(an_editor['author']['last_name']) != float:
+                if an_editor.last_name:
                     this_editor = et.SubElement(persons, 'author')
-                    role = et.SubElement(this_editor, 'role')
-                    role.text = 'editor'
+                    text_element(this_editor, 'role', 'editor')
                     this_person = et.SubElement(this_editor, 'person')
-                    # this_person.set('id', str(an_editor['author_id']))
-                    first_name = et.SubElement(this_person, 'firstName')
-                    first_name.text = an_editor['author']['first_name']
-                    last_name = et.SubElement(this_person, 'lastName')
-                    last_name.text = an_editor['author']['last_name']
-                    if type(an_editor['unit_affiliation']) == str and 'imported' in str(an_editor['author_id']):
+                    # this_person.set('id', str(an_editor.author_id))
+                    if an_editor.first_name:
+                        text_element(this_person, 'firstName', an_editor.first_name)
+                    text_element(this_person, 'lastName', an_editor.last_name)
+                    if isinstance(an_editor.unit_affiliation, str) and an_editor.is_imported:
                         organizations = et.SubElement(this_editor, 'organisations')
                         organization = et.SubElement(organizations, 'organisation')
-                        org_name = et.SubElement(organization, 'name')
-                        org_name_text = et.SubElement(org_name, 'tns:text')
-                        org_name_text.text = an_editor['unit_affiliation']
-                    else:
-                        pass
-                else: pass
+                        localized_text(organization, 'name', an_editor.unit_affiliation, lang=None, country=None)
         else:
             print('no author or editor. This will cause the upload to fail.')
-            pass
         # setting organizational owner (pri)
-        the_organizations = et.SubElement(book, 'organisations')
-        the_organization = et.SubElement(the_organizations, 'organisation')
-        the_organization.set('id', '3022427')
-        owner = et.SubElement(book, 'owner')
-        owner.set('id', '3022427')
+        append_pri_owner(book)
         # if we get keywords, they should go here
         # keywords = et.SubElement(chapterInBook, 'keywords')
-        # logicalGroup = et.SubElement(keywords, 'tns:logicalGroup')
-        # structured_keywords = et.SubElement(logicalGroup, 'tns:structuredKeywords')
-        # structured_keyword = et.SubElement(structured_keywords, 'tns:structuredKeyword')
-        # free_keywords = et.SubElement(structured_keyword, 'tns:freeKeywords')
-        # free_keyword = et.SubElement(free_keywords, 'tns:freeKeyword')
-        if type(pm.get_url(publication)) == str:
-            these_urls = pm.get_url(publication).split(';')
-            urls = et.SubElement(book, 'urls')
-            for this_url in these_urls:
-                url = et.SubElement(urls, 'url')
-                a_url = et.SubElement(url, 'url')
-                a_url.text = this_url
-                description = et.SubElement(url, 'description')
-                description_text = et.SubElement(description, 'tns:text')
-                description_text.text = 'Other Link'
-                url_type = et.SubElement(url, 'type')
-                url_type.text = 'unspecified'
-        else:
-           pass
+        # logicalGroup = et.SubElement(keywords, TNS + 'logicalGroup')
+        # structured_keywords = et.SubElement(logicalGroup, TNS + 'structuredKeywords')
+        # structured_keyword = et.SubElement(structured_keywords, TNS + 'structuredKeyword')
+        # free_keywords = et.SubElement(structured_keyword, TNS + 'freeKeywords')
+        # free_keyword = et.SubElement(free_keywords, TNS + 'freeKeyword')
+        append_urls(book, these_urls)
         # setting doi
-        if type(pm.get_doi(publication)) == str:
-            electronic_version_doi = et.SubElement(book, 'electronicVersionDOI')
-            doi_version = et.SubElement(electronic_version_doi, 'version')
-            doi_version.text = "publishersversion"
-            # licence = et.SubElement(electronic_version_doi, 'licence')
-            public_access = et.SubElement(electronic_version_doi, 'publicAccess')
-            public_access.text = 'unknown'
-            the_doi = et.SubElement(electronic_version_doi, 'doi')
-            the_doi.text = str(pm.get_doi(publication))
-        else:
-            pass
+        append_doi(book, doi)
         # setting page ranges and number of pages
-        if type(pm.get_pages_range(publication)) == str:
-            the_pages = et.SubElement(book, 'pages')
-            the_pages.text = pm.get_pages_range(publication)
-        else:
-            pass
-        if type(pm.get_number_pages(publication)) == str:
-            number_pages = et.SubElement(book, 'numberOfPages')
-            number_pages.text = pm.get_number_pages(publication)
-        else:
-            pass
+        append_pages(book, pages_range, num_pages)
         # setting print ISBNs- this will require manual data cleaning because
         # Susan's script has both print and electronic isbns in the same column
-        if type(pm.get_isbn(publication)) == str:
-            print_isbns = et.SubElement(book, 'printIsbns')
-            isbn = et.SubElement(print_isbns, 'isbn')
-            isbn.text = pm.get_isbn(publication)
-        else:
-            pass
+        append_text(book, 'printIsbns/isbn', isbn_value)
         # setting publisher and series info if applicable
-        if type(pm.get_volume(publication)) == str and type(pm.get_issn(publication)) == str and type(pm.get_publisher(publication)) == str:
+        if isinstance(volume_value, str) and these_issns and isinstance(publisher_value, str):
             series = et.SubElement(book, 'series')
             this_series = et.SubElement(series, 'serie')
             publisher = et.SubElement(this_series, 'publisher')
-            publisher_name = et.SubElement(publisher, 'publisherName')
-            publisher_name.text = pm.get_publisher(publication)
-            volume = et.SubElement(this_series, 'volume')
-            volume.text = pm.get_volume(publication)
-            if type(pm.get_issue(publication)) == str:
-                issue = et.SubElement(this_series, 'number')
-                issue.text = pm.get_issue(publication)
-            else:
-                pass
-            issn = et.SubElement(this_series, 'printIssn')
-            issn.text = pm.get_issn(publication)
-        elif type(pm.get_publisher(publication)) == str:
+            text_element(publisher, 'publisherName', publisher_value)
+            text_element(this_series, 'volume', volume_value)
+            append_text(this_series, 'number', issue_value)
+            text_element(this_series, 'printIssn', these_issns[0])
+        elif isinstance(publisher_value, str):
             publisher = et.SubElement(book, 'publisher')
-            publisher_name = et.SubElement(publisher, 'name')
-            publisher_name.text = pm.get_publisher(publication)
-        else: pass
+            text_element(publisher, 'name', publisher_value)
+        return book
     else:
-        return publication
-
-
-def write_preprint_xml(publication, root, setting, internal_persons):
-    if (type(pm.get_publication_year(publication)) == int) and (type(pm.get_title(publication)) == str):
-        preprint = et.SubElement(root, 'workingPaper')
-        preprint.set('id', pm.get_id(publication))
-        preprint.set('subType', 'preprint')
-        peer_review = et.SubElement(preprint, 'peerReviewed')
-        peer_review.text = 'false'
-        # pub status
-        pub_statuses = et.SubElement(preprint, 'publicationStatuses')
-        pub_status = et.SubElement(pub_statuses, 'publicationStatus')
-        status_type = et.SubElement(pub_status, 'statusType')
-        status_type.text = 'inprep'
-        date = et.SubElement(pub_status, 'date')
-        the_year = et.SubElement(date, 'tns:year')
-        if type(pm.get_publication_year(publication)) != float:
-            the_year.text = str(pm.get_publication_year(publication))
-        else:
-            print('research output', pm.get_id(publication), 'is missing required year field. upload will fail.')
-        # language
-        language = et.SubElement(preprint, 'language')
-        language.text = 'en_US'
-        # title
-        if type(pm.get_title(publication)) == str:
-            title = et.SubElement(preprint, 'title')
-            title_text = et.SubElement(title, 'tns:text')
-            title_text.set('lang', 'en')
-            title_text.set('country', 'US')
-            title_text.text = pm.get_title(publication)
-        else:
-            print('research output', pm.get_id(publication), 'is missing required title field. upload will fail.')
-        # abstract
-        if type(pm.get_abstract(publication)) == str:
-            abstract = et.SubElement(preprint, 'abstract')
-            abstract_text = et.SubElement(abstract, 'tns:text')
-            abstract_text.set('lang', 'en')
-            abstract_text.set('country', 'US')
-            abstract_text.text = pm.get_abstract(publication)
+        return None
+
+
+def write_preprint_xml(publication, setting, internal_persons, persons_index=None):
+    # look up each field once; the checks below reuse these locals
+    pub_id = pm.get_id(publication)
+    pub_year = pm.get_publication_year(publication)
+    pub_title = pm.get_title(publication)
+    abstract_value = pm.get_abstract(publication)
+    these_urls = pm.get_urls(publication)
+    doi = pm.get_doi(publication)
+    num_pages = pm.get_number_pages(publication)
+    author_data = pm.get_author_data(publication)
+    if isinstance(pub_year, int) and isinstance(pub_title, str):
+        preprint, persons = start_record(PREPRINT_SKELETON, pub_id, 'preprint', pub_year, pub_title, abstract_value)
         # authors
-        persons = et.SubElement(preprint, 'persons')
-        the_authors = pm.get_internal_external_authors(pm.get_author_data(publication), internal_persons, 79)
-        for an_author in the_authors:
-            this_author = et.SubElement(persons, 'author')
-            role = et.SubElement(this_author, 'role')
-            role.text = 'author'
-            this_person = et.SubElement(this_author, 'person')
-            this_person.set('id', str(an_author['author_id']))
-            if type(an_author['author']['first_name']) == str:
-                first_name = et.SubElement(this_person, 'firstName')
-                first_name.text = an_author['author']['first_name']
-            else:
-                pass
-            last_name = et.SubElement(this_person, 'lastName')
-            last_name.text = an_author['author']['last_name']
-            if type(an_author['unit_affiliation']) == str:
-                if 'imported' in str(an_author['author_id']):
-                    pass
-                else:
-                    organizations = et.SubElement(this_author, 'organisations')
-                    organization = et.SubElement(organizations, 'organisation')
-                    org_name = et.SubElement(organization, 'name')
-                    org_name_text = et.SubElement(org_name, 'tns:text')
-                    org_name_text.text = an_author['unit_affiliation']
-            else:
-                pass
+        append_authors(persons, author_data, internal_persons, persons_index)
         # setting organizational owner (pri)
-        the_organizations = et.SubElement(preprint, 'organisations')
-        the_organization = et.SubElement(the_organizations, 'organisation')
-        the_organization.set('id', '3022427')
-        owner = et.SubElement(preprint, 'owner')
-        owner.set('id', '3022427')
+        append_pri_owner(preprint)
         # urls
-        if type(pm.get_url(publication)) == str:
-            these_urls = pm.get_url(publication).split(';')
-            urls = et.SubElement(preprint, 'urls')
-            for this_url in these_urls:
-                url = et.SubElement(urls, 'url')
-                a_url = et.SubElement(url, 'url')
-                a_url.text = this_url
-                description = et.SubElement(url, 'description')
-                description_text = et.SubElement(description, 'tns:text')
-                description_text.text = 'Other Link'
-                url_type = et.SubElement(url, 'type')
-                url_type.text = 'unspecified'
-        else:
-            pass
-            # doi
-        if type(pm.get_doi(publication)) == str:
-            electronic_versions = et.SubElement(preprint, 'electronicVersions')
-            electronic_version_doi = et.SubElement(electronic_versions, 'electronicVersionDOI')
-            doi_version = et.SubElement(electronic_version_doi, 'version')
-            doi_version.text = "publishersversion"
-            # licence = et.SubElement(electronic_version_doi, 'licence')
-            public_access = et.SubElement(electronic_version_doi, 'publicAccess')
-            public_access.text = 'unknown'
-            the_doi = et.SubElement(electronic_version_doi, 'doi')
-            the_doi.text = str(pm.get_doi(publication))
-        else:
-            pass
-            # print(pm.get_doi(publication))
-            # setting page ranges and number of pages
-        if type(pm.get_number_pages(publication)) == str:
-            number_pages = et.SubElement(preprint, 'numberOfPages')
-            number_pages.text = pm.get_number_pages(publication)
-        else:
-            pass
+        append_urls(preprint, these_urls)
+        # doi
+        append_doi(preprint, doi, electronic_versions=True)
+        # setting page ranges and number of pages
+        append_pages(preprint, None, num_pages)
+        return preprint
     else:
-        return publication
-
-
-def write_tech_report_xml(publication, root, setting, internal_persons):
-    if (type(pm.get_publication_year(publication)) == int) and (type(pm.get_title(publication)) == str):
-        tech_report = et.SubElement(root, 'book')
-        tech_report.set('id', pm.get_id(publication))
-        tech_report.set('subType', 'technical_report')
-        peer_review = et.SubElement(tech_report, 'peerReviewed')
-        peer_review.text = 'false'
-        # pub status
-        pub_statuses = et.SubElement(tech_report, 'publicationStatuses')
-        pub_status = et.SubElement(pub_statuses, 'publicationStatus')
-        status_type = et.SubElement(pub_status, 'statusType')
-        status_type.text = 'published'
-        date = et.SubElement(pub_status, 'date')
-        the_year = et.SubElement(date, 'tns:year')
-        if type(pm.get_publication_year(publication)) != float:
-            the_year.text = str(pm.get_publication_year(publication))
-        else:
-            print('research output', pm.get_id(publication), 'is missing required year field. upload will fail.')
-        # language
-        language = et.SubElement(tech_report, 'language')
-        language.text = 'en_US'
-        # title
-        if type(pm.get_title(publication)) == str:
-            title = et.SubElement(tech_report, 'title')
-            title_text = et.SubElement(title, 'tns:text')
-            title_text.set('lang', 'en')
-            title_text.set('country', 'US')
-            title_text.text = pm.get_title(publication)
-        else:
-            print('research output', pm.get_id(publication), 'is missing required title field. upload will fail.')
-        # abstract
-        if type(pm.get_abstract(publication)) == str:
-            abstract = et.SubElement(tech_report, 'abstract')
-            abstract_text = et.SubElement(abstract, 'tns:text')
-            abstract_text.set('lang', 'en')
-            abstract_text.set('country', 'US')
-            abstract_text.text = pm.get_abstract(publication)
-        else:
-            pass
+        return None
+
+
+def write_tech_report_xml(publication, setting, internal_persons, persons_index=None):
+    # look up each field once; the checks below reuse these locals
+    pub_id = pm.get_id(publication)
+    pub_year = pm.get_publication_year(publication)
+    pub_title = pm.get_title(publication)
+    abstract_value = pm.get_abstract(publication)
+    these_urls = pm.get_urls(publication)
+    doi = pm.get_doi(publication)
+    num_pages = pm.get_number_pages(publication)
+    isbn_value = pm.get_isbn(publication)
+    publisher_value = pm.get_publisher(publication)
+    volume_value = pm.get_volume(publication)
+    issue_value = pm.get_issue(publication)
+    these_issns = pm.get_issns(publication)
+    author_data = pm.get_author_data(publication)
+    if isinstance(pub_year, int) and isinstance(pub_title, str):
+        tech_report, persons = start_record(TECH_REPORT_SKELETON, pub_id, 'technical_report', pub_year, pub_title, abstract_value)
         # authors
-        persons = et.SubElement(tech_report, 'persons')
-        if type(pm.get_author_data(publication)) == float:
+        if not author_data:
             an_author = et.SubElement(persons, 'author')
-            role = et.SubElement(an_author, 'role')
-            role.text = 'author'
+            text_element(an_author, 'role', 'author')
             organizations = et.SubElement(an_author, 'organisations')
             organization = et.SubElement(organizations, 'organisation')
-            organization.set('id', '3022427')
-            org_name = et.SubElement(organization, 'name')
-            org_name_text = et.SubElement(org_name, 'tns:text')
-            org_name_text.text = 'Prairie Research Institute'
-
+            organization.set('id', PRI_ORG_ID)
+            localized_text(organization, 'name', 'Prairie Research Institute', lang=None, country=None)
         else:
-            # persons = et.SubElement(tech_report, 'persons')
-            the_authors = pm.get_internal_external_authors(pm.get_author_data(publication), internal_persons, 79)
-            for an_author in the_authors:
-                this_author = et.SubElement(persons, 'author')
-                role = et.SubElement(this_author, 'role')
-                role.text = 'author'
-                this_person = et.SubElement(this_author, 'person')
-                this_person.set('id', str(an_author['author_id']))
-                if type(an_author['author']['first_name']) == str:
-                    first_name = et.SubElement(this_person, 'firstName')
-                    first_name.text = an_author['author']['first_name']
-                else:
-                    pass
-                last_name = et.SubElement(this_person, 'lastName')
-                last_name.text = an_author['author']['last_name']
-                if type(an_author['unit_affiliation']) == str:
-                    if 'imported' in str(an_author['author_id']):
-                        pass
-                    else:
-                        organizations = et.SubElement(this_author, 'organisations')
-                        organization = et.SubElement(organizations, 'organisation')
-                        org_name = et.SubElement(organization, 'name')
-                        org_name_text = et.SubElement(org_name, 'tns:text')
-                        org_name_text.text = an_author['unit_affiliation']
-                else:
-                    pass
+            append_authors(persons, author_data, internal_persons, persons_index)
         # setting organizational owner (pri)
-        the_organizations = et.SubElement(tech_report, 'organisations')
-        the_organization = et.SubElement(the_organizations, 'organisation')
-        the_organization.set('id', '3022427')
-        owner = et.SubElement(tech_report, 'owner')
-        owner.set('id', '3022427')
+        append_pri_owner(tech_report)
         # urls
-        if type(pm.get_url(publication)) == str:
-            these_urls = pm.get_url(publication).split(';')
-            urls = et.SubElement(tech_report, 'urls')
-            for this_url in these_urls:
-                url = et.SubElement(urls, 'url')
-                a_url = et.SubElement(url, 'url')
-                a_url.text = this_url
-                description = et.SubElement(url, 'description')
-                description_text = et.SubElement(description, 'tns:text')
-                description_text.text = 'Other Link'
-                url_type = et.SubElement(url, 'type')
-                url_type.text = 'unspecified'
-        else:
-            pass
-            # print(pm.get_url(publication))
+        append_urls(tech_report, these_urls)
         # doi
-        if type(pm.get_doi(publication)) == str:
-            electronic_versions = et.SubElement(tech_report, 'electronicVersions')
-            electronic_version_doi = et.SubElement(electronic_versions, 'electronicVersionDOI')
-            doi_version = et.SubElement(electronic_version_doi, 'version')
-            doi_version.text = "publishersversion"
-            # licence = et.SubElement(electronic_version_doi, 'licence')
-            public_access = et.SubElement(electronic_version_doi, 'publicAccess')
-            public_access.text = 'unknown'
-            the_doi = et.SubElement(electronic_version_doi, 'doi')
-            the_doi.text = str(pm.get_doi(publication))
-        else:
-            pass
-            # print(pm.get_doi(publication))
+        append_doi(tech_report, doi, electronic_versions=True)
         # setting page ranges and number of pages
-        if type(pm.get_number_pages(publication)) == str:
-            number_pages = et.SubElement(tech_report, 'numberOfPages')
-            number_pages.text = pm.get_number_pages(publication)
-        else:
-            pass
-        if type(pm.get_isbn(publication)) == str:
-            print_isbns = et.SubElement(tech_report, 'printIsbns')
-            isbn = et.SubElement(print_isbns, 'isbn')
-            isbn.text = pm.get_isbn(publication)
-            print(pm.get_isbn(publication))
-        else:
-            pass
-        if type(pm.get_publisher(publication)) == str:
-            publisher = et.SubElement(tech_report, 'publisher')
-            publisher_name = et.SubElement(publisher, 'name')
-            publisher_name.text = pm.get_publisher(publication)
-        else:
-            pass
-        if type(pm.get_volume(publication)) == str and type(pm.get_issn(publication)) == str:
-            series = et.SubElement(tech_report, 'series')
-            this_series = et.SubElement(series, 'serie')
-            volume = et.SubElement(this_series, 'volume')
-            volume.text = pm.get_volume(publication)
-            if type(pm.get_issue(publication)) == str:
-                issue = et.SubElement(this_series, 'number')
-                issue.text = pm.get_issue(publication)
-            else:
-                pass
-            issn = et.SubElement(this_series, 'printIssn')
-            issn.text = pm.get_issn(publication)
-        elif type(pm.get_volume(publication)) == str:
-            series = et.SubElement(tech_report, 'series')
-            this_series = et.SubElement(series, 'serie')
-            volume = et.SubElement(this_series, 'volume')
-            volume.text = pm.get_volume(publication)
-            if type(pm.get_issue(publication)) == str:
-                issue = et.SubElement(this_series, 'number')
-                issue.text = pm.get_issue(publication)
-            else:
-                pass
-        elif type(pm.get_issn(publication)) == str:
-            series = et.SubElement(tech_report, 'series')
-            this_series = et.SubElement(series, 'serie')
-            issn = et.SubElement(this_series, 'printIssn')
-            issn.text = pm.get_issn(publication)
-        else:
-            pass
+        append_pages(tech_report, None, num_pages)
+        append_text(tech_report, 'printIsbns/isbn', isbn_value)
+        append_text(tech_report, 'publisher/name', publisher_value)
+        append_series(tech_report, volume_value, issue_value, these_issns)
+        return tech_report
     else:
-        return publication
-
-
-def write_journal_article_xml(publication, root, setting, internal_persons):
+        return None
+
+
+def write_journal_article_xml(publication, setting, internal_persons, persons_index=None):
+    # look up each field once; the checks below reuse these locals
+    pub_id = pm.get_id(publication)
+    pub_year = pm.get_publication_year(publication)
+    pub_title = pm.get_title(publication)
+    journal_value = pm.get_journal(publication)
+    abstract_value = pm.get_abstract(publication)
+    these_urls = pm.get_urls(publication)
+    doi = pm.get_doi(publication)
+    pages_range = pm.get_pages_range(publication)
+    num_pages = pm.get_number_pages(publication)
+    issue_value = pm.get_issue(publication)
+    volume_value = pm.get_volume(publication)
+    these_issns = pm.get_issns(publication)
+    author_data = pm.get_author_data(publication)
     # journal article type requires fields: pub year, article title, authors, language, and journal title
     # this script will remove any pubs not fitting these criteria
-    if (type(pm.get_publication_year(publication)) == int) and (type(pm.get_title(publication)) == str) and (type(pm.get_journal(publication))== str):
-        journal_contribution = et.SubElement(root, 'contributionToJournal')
-        journal_contribution.set('id', pm.get_id(publication))
-        journal_contribution.set('subType', 'article')
-        peer_review = et.SubElement(journal_contribution, 'peerReviewed')
-        peer_review.text = 'true'
-        # pub status
-        pub_statuses = et.SubElement(journal_contribution, 'publicationStatuses')
-        pub_status = et.SubElement(pub_statuses, 'publicationStatus')
-        status_type = et.SubElement(pub_status, 'statusType')
-        status_type.text = 'published'
-        date = et.SubElement(pub_status, 'date')
-        the_year = et.SubElement(date, 'tns:year')
-        if type(pm.get_publication_year(publication)) != float:
-            the_year.text = str(pm.get_publication_year(publication))
-        else:
-            print('research output', pm.get_id(publication), 'is missing required year field. upload will fail.')
-        # language
-        language = et.SubElement(journal_contribution, 'language')
-        language.text = 'en_US'
-        # title
-        if type(pm.get_title(publication)) == str:
-            title = et.SubElement(journal_contribution, 'title')
-            title_text = et.SubElement(title, 'tns:text')
-            title_text.set('lang', 'en')
-            title_text.set('country', 'US')
-            title_text.text = pm.get_title(publication)
-        else:
-            print('research output', pm.get_id(publication), 'is missing required title field. upload will fail.')
-        # abstract
-        if type(pm.get_abstract(publication)) == str:
-            abstract = et.SubElement(journal_contribution, 'abstract')
-            abstract_text = et.SubElement(abstract, 'tns:text')
-            abstract_text.set('lang', 'en')
-            abstract_text.set('country', 'US')
-            abstract_text.text = pm.get_abstract(publication)
-        else:
-            pass
+    if isinstance(pub_year, int) and isinstance(pub_title, str) and isinstance(journal_value, str):
+        journal_contribution, persons = start_record(JOURNAL_SKELETON, pub_id, 'article', pub_year, pub_title, abstract_value)
         # authors
-        persons = et.SubElement(journal_contribution, 'persons')
-        the_authors = pm.get_internal_external_authors(pm.get_author_data(publication), internal_persons, 79)
-        for an_author in the_authors:
-            this_author = et.SubElement(persons, 'author')
-            role = et.SubElement(this_author, 'role')
-            role.text = 'author'
-            this_person = et.SubElement(this_author, 'person')
-            this_person.set('id', str(an_author['author_id']))
-            if type(an_author['author']['first_name']) == str:
-                first_name = et.SubElement(this_person, 'firstName')
-                first_name.text = an_author['author']['first_name']
-            else:
-                pass
-            last_name = et.SubElement(this_person, 'lastName')
-            last_name.text = an_author['author']['last_name']
-            if type(an_author['unit_affiliation']) == str:
-                if 'imported' in str(an_author['author_id']):
-                    pass
-                else:
-                    organizations = et.SubElement(this_author, 'organisations')
-                    organization = et.SubElement(organizations, 'organisation')
-                    org_name = et.SubElement(organization, 'name')
-                    org_name_text = et.SubElement(org_name, 'tns:text')
-                    org_name_text.text = an_author['unit_affiliation']
-            else:
-                pass
+        append_authors(persons, author_data, internal_persons, persons_index)
         # setting organizational owner (pri)
-        the_organizations = et.SubElement(journal_contribution, 'organisations')
-        the_organization = et.SubElement(the_organizations, 'organisation')
-        the_organization.set('id', '3022427')
-        owner = et.SubElement(journal_contribution, 'owner')
-        owner.set('id', '3022427')
+        append_pri_owner(journal_contribution)
         # urls
-        if type(pm.get_url(publication)) == str:
-            these_urls = pm.get_url(publication).split(';')
-            urls = et.SubElement(journal_contribution, 'urls')
-            for this_url in these_urls:
-                url = et.SubElement(urls, 'url')
-                a_url = et.SubElement(url, 'url')
-                a_url.text = this_url
-                description = et.SubElement(url, 'description')
-                description_text = et.SubElement(description, 'tns:text')
-                description_text.text = 'Other Link'
-                url_type = et.SubElement(url, 'type')
-                url_type.text = 'unspecified'
-        else:
-            pass
-            # print(pm.get_url(publication))
+        append_urls(journal_contribution, these_urls)
         # doi
-        if type(pm.get_doi(publication)) == str:
-            electronic_versions = et.SubElement(journal_contribution, 'electronicVersions')
-            electronic_version_doi = et.SubElement(electronic_versions, 'electronicVersionDOI')
-            doi_version = et.SubElement(electronic_version_doi, 'version')
-            doi_version.text = "publishersversion"
-            # licence = et.SubElement(electronic_version_doi, 'licence')
-            public_access = et.SubElement(electronic_version_doi, 'publicAccess')
-            public_access.text = 'unknown'
-            the_doi = et.SubElement(electronic_version_doi, 'doi')
-            the_doi.text = str(pm.get_doi(publication))
-        else:
-            pass
-            # print(pm.get_doi(publication))
+        append_doi(journal_contribution, doi, electronic_versions=True)
         # setting page ranges and number of pages
-        if type(pm.get_pages_range(publication)) == str:
-            the_pages = et.SubElement(journal_contribution, 'pages')
-            the_pages.text = pm.get_pages_range(publication)
-        else:
-            pass
-        if type(pm.get_number_pages(publication)) == str:
-            number_pages = et.SubElement(journal_contribution, 'numberOfPages')
-            number_pages.text = pm.get_number_pages(publication)
-        else:
-            pass
+        append_pages(journal_contribution, pages_range, num_pages)
 
-        if type(pm.get_issue(publication)) == str:
-            issue_number = et.SubElement(journal_contribution, 'journalNumber')
-            issue_number.text = pm.get_issue(publication)
-        else:
-            pass
-        if type(pm.get_volume(publication)) == str:
-            volume_number = et.SubElement(journal_contribution, 'journalVolume')
-            volume_number.text = pm.get_volume(publication)
-        else:
-            pass
+        append_text(journal_contribution, 'journalNumber', issue_value)
+        append_text(journal_contribution, 'journalVolume', volume_value)
         # journal metadata (title, issn)
 
-        if type(pm.get_journal(publication)) == str:
-            journal = et.SubElement(journal_contribution, 'journal')
-            journal_title = et.SubElement(journal, 'title')
-            journal_title.text = pm.get_journal(publication)
-        else:
-            print('research output', pm.get_id(publication), 'is missing required journal field. upload will fail.')
-        these_issns = pm.get_issn(publication)
-        if type(these_issns) == list:
+        # the journal title is required and was checked above
+        journal = et.SubElement(journal_contribution, 'journal')
+        text_element(journal, 'title', journal_value)
+        if these_issns:
             issns = et.SubElement(journal, 'printIssns')
             for this_issn in these_issns:
-                issn = et.SubElement(issns, 'issn')
-                issn.text = this_issn
-        else:
-            pass
+                text_element(issns, 'issn', this_issn)
+        return journal_contribution
     else:
-        return publication
-
-
-def write_conferencePaper_xml(publication, root, setting, internal_persons):
-    # conference paper has required types pub year, language, title, author, managing unit, and host pub title
-    if (type(pm.get_publication_year(publication)) == int) and (type(pm.get_title(publication)) == str) and (
-            type(pm.get_journal(publication)) == str):
-        conferenceContribution = et.SubElement(root, "chapterInBook")
-        conferenceContribution.set('id', pm.get_id(publication))
-        conferenceContribution.set('subType', 'conference')
-        peer_review = et.SubElement(conferenceContribution, 'peerReviewed')
-        peer_review.text = 'false'
-        # pub status stuff
-        pub_statuses = et.SubElement(conferenceContribution, 'publicationStatuses')
-        pub_status = et.SubElement(pub_statuses, 'publicationStatus')
-        status_type = et.SubElement(pub_status, 'statusType')
-        status_type.text = 'published'
-        date = et.SubElement(pub_status, 'date')
-        the_year = et.SubElement(date, 'tns:year')
-        if type(pm.get_publication_year(publication)) != float:
-            the_year.text = str(pm.get_publication_year(publication))
-        else:
-            print('research output', pm.get_id(publication), 'is missing required year field. upload will fail.')
-        # language
-        language = et.SubElement(conferenceContribution, 'language')
-        language.text = 'en_US'
-        # title
-        if type(pm.get_title(publication)) == str:
-            title = et.SubElement(conferenceContribution, 'title')
-            title_text = et.SubElement(title, 'tns:text')
-            title_text.set('lang', 'en')
-            title_text.set('country', 'US')
-            title_text.text = pm.get_title(publication)
-        else:
-            print('research output', pm.get_id(publication), 'is missing required title field. upload will fail.')
-        # abstract
-        if type(pm.get_abstract(publication)) == str:
-            abstract = et.SubElement(conferenceContribution, 'abstract')
-            abstract_text = et.SubElement(abstract, 'tns:text')
-            abstract_text.set('lang', 'en')
-            abstract_text.set('country', 'US')
-            abstract_text.text = pm.get_abstract(publication)
-        else:
-            pass
-        persons = et.SubElement(conferenceContribution, 'persons')
-        the_authors = pm.get_internal_external_authors(pm.get_author_data(publication), internal_persons, 79)
-        for an_author in the_authors:
-            this_author = et.SubElement(persons, 'author')
-            role = et.SubElement(this_author, 'role')
-            role.text = 'author'
-            this_person = et.SubElement(this_author, 'person')
-            this_person.set('id', str(an_author['author_id']))
-            if type(an_author['author']['first_name']) == str:
-                first_name = et.SubElement(this_person, 'firstName')
-                first_name.text = an_author['author']['first_name']
-            else:
-                pass
-            last_name = et.SubElement(this_person, 'lastName')
-            last_name.text = an_author['author']['last_name']
-            if type(an_author['unit_affiliation']) == str:
-                if 'imported' in str(an_author['author_id']):
-                    pass
-                else:
-                    organizations = et.SubElement(this_author, 'organisations')
-                    organization = et.SubElement(organizations, 'organisation')
-                    org_name = et.SubElement(organization, 'name')
-                    org_name_text = et.SubElement(org_name, 'tns:text')
-                    org_name_text.text = an_author['unit_affiliation']
-            else:
-                pass
+        return None
+
+
+def write_conferencePaper_xml(publication, setting, internal_persons, persons_index=None):
+    # a conference paper is written as a chapterInBook record like a chapter; it is just not peer reviewed and its
+    # doi is closed access, wrapped in electronicVersions
+    return write_chapterInBook_xml(publication, setting, internal_persons, persons_index, skeleton=CONFERENCE_SKELETON,
+                                   sub_type='conference', public_access_value='closed', electronic_versions=True)
+
+
+def write_chapterInBook_xml(publication, setting, internal_persons, persons_index=None, skeleton=CHAPTER_SKELETON,
+                            sub_type=None, public_access_value='unknown', electronic_versions=False):
+    # look up each field once; the checks below reuse these locals
+    pub_id = pm.get_id(publication)
+    pub_year = pm.get_publication_year(publication)
+    pub_title = pm.get_title(publication)
+    journal = pm.get_journal(publication)
+    abstract_value = pm.get_abstract(publication)
+    these_urls = pm.get_urls(publication)
+    doi = pm.get_doi(publication)
+    pages_range = pm.get_pages_range(publication)
+    num_pages = pm.get_number_pages(publication)
+    isbn_value = pm.get_isbn(publication)
+    publisher_value = pm.get_publisher(publication)
+    volume_value = pm.get_volume(publication)
+    issue_value = pm.get_issue(publication)
+    these_issns = pm.get_issns(publication)
+    author_data = pm.get_author_data(publication)
+    # chapters and conference papers require pub year, title and host publication title
+    if isinstance(pub_year, int) and isinstance(pub_title, str) and isinstance(journal, str):
+        # peer review, pub status and language come from a prebuilt skeleton; only the year is filled in.
+        # year, title and host publication title were checked above, so they are written without another check
+        chapterInBook, persons = start_record(skeleton, pub_id, sub_type or setting['subType'], pub_year, pub_title, abstract_value)
+        append_authors(persons, author_data, internal_persons, persons_index)
 
         # setting organizational owner (pri)
-        the_organizations = et.SubElement(conferenceContribution, 'organisations')
-        the_organization = et.SubElement(the_organizations, 'organisation')
-        the_organization.set('id', '3022427')
-        owner = et.SubElement(conferenceContribution, 'owner')
-        owner.set('id', '3022427')
+        append_pri_owner(chapterInBook)
 
         # if we get keywords, they should go here
-        # keywords = et.SubElement(conferenceContribution, 'keywords')
-        # logicalGroup = et.SubElement(keywords, 'tns:logicalGroup')
-        # structured_keywords = et.SubElement(logicalGroup, 'tns:structuredKeywords')
-        # structured_keyword = et.SubElement(structured_keywords, 'tns:structuredKeyword')
-        # free_keywords = et.SubElement(structured_keyword, 'tns:freeKeywords')
-        # free_keyword = et.SubElement(free_keywords, 'tns:freeKeyword')
-
-        if type(pm.get_url(publication)) == str:
-            these_urls = pm.get_url(publication).split(';')
-            urls = et.SubElement(conferenceContribution, 'urls')
-            # this has split the urls into letters :(
-            for this_url in these_urls:
-                url = et.SubElement(urls, 'url')
-                a_url = et.SubElement(url, 'url')
-                a_url.text = this_url
-                description = et.SubElement(url, 'description')
-                description_text = et.SubElement(description, 'tns:text')
-                description_text.text = 'Other Link'
-                url_type = et.SubElement(url, 'type')
-                url_type.text = 'unspecified'
-        else:
-            pass
-            # print(pm.get_url(publication))
-
-        if type(pm.get_doi(publication)) == str:
-            electronic_versions = et.SubElement(conferenceContribution, 'electronicVersions')
-            electronic_version_doi = et.SubElement(electronic_versions, 'electronicVersionDOI')
-            doi_version = et.SubElement(electronic_version_doi, 'version')
-            doi_version.text = "publishersversion"
-            # licence = et.SubElement(electronic_version_doi, 'licence')
-            public_access = et.SubElement(electronic_version_doi, 'publicAccess')
-            public_access.text = 'closed'
-            the_doi = et.SubElement(electronic_version_doi, 'doi')
-            the_doi.text = str(pm.get_doi(publication))
-        else:
-            pass
-            # print(pm.get_doi(publication))
+        # keywords = et.SubElement(chapterInBook, 'keywords')
+        # logicalGroup = et.SubElement(keywords, TNS + 'logicalGroup')
+        # structured_keywords = et.SubElement(logicalGroup, TNS + 'structuredKeywords')
+        # structured_keyword = et.SubElement(structured_keywords, TNS + 'structuredKeyword')
+        # free_keywords = et.SubElement(structured_keyword, TNS + 'freeKeywords')
+        # free_keyword = et.SubElement(free_keywords, TNS + 'freeKeyword')
+
+        append_urls(chapterInBook, these_urls)
+
+        append_doi(chapterInBook, doi, public_access_value, electronic_versions)
 
         # setting page ranges and number of pages
-        if type(pm.get_pages_range(publication)) == str:
-            the_pages = et.SubElement(conferenceContribution, 'pages')
-            the_pages.text = pm.get_pages_range(publication)
-        else:
-            pass
-            # print(pm.get_pages_range(publication))
-        if type(pm.get_number_pages(publication)) == str:
-            number_pages = et.SubElement(conferenceContribution, 'numberOfPages')
-            number_pages.text = pm.get_number_pages(publication)
-        else:
-            pass
-            # print(pm.get_number_pages(publication))
+        append_pages(chapterInBook, pages_range, num_pages)
         # setting print ISBNs- this will require manual data cleaning because
         # Susan's script has both print and electronic isbns in the same column
         # right now
-        if type(pm.get_isbn(publication)) == str:
-            print_isbns = et.SubElement(conferenceContribution, 'printIsbns')
-            isbn = et.SubElement(print_isbns, 'isbn')
-            isbn.text = pm.get_isbn(publication)
-            # print(pm.get_isbn(publication))
-        else:
-            pass
+        append_text(chapterInBook, 'printIsbns/isbn', isbn_value)
         # setting host publication (book/anthology title)
-        host_pub = et.SubElement(conferenceContribution, 'hostPublicationTitle')
-        try:
-            host_pub.text = str(pm.get_journal(publication))
-        except TypeError:
-            print('there is no host publication title. this is a required field. upload will fail.')
-        if type(pm.get_publisher(publication)) == str:
-            publisher = et.SubElement(conferenceContribution, 'publisher')
-            publisher_name = et.SubElement(publisher, 'name')
-            publisher_name.text = pm.get_publisher(publication)
-        else:
-            pass
-            # print(pm.get_publisher(publication))
-        if type(pm.get_volume(publication)) == str and type(pm.get_issn(publication)) == str:
-            series = et.SubElement(conferenceContribution, 'series')
-            this_series = et.SubElement(series, 'serie')
-            volume = et.SubElement(this_series, 'volume')
-            volume.text = pm.get_volume(publication)
-            if type(pm.get_issue(publication)) == str:
-                issue = et.SubElement(this_series, 'number')
-                issue.text = pm.get_issue(publication)
-            else:
-                pass
-            issn = et.SubElement(this_series, 'printIssn')
-            issn.text = pm.get_issn(publication)
-        elif type(pm.get_volume(publication)) == str:
-            series = et.SubElement(conferenceContribution, 'series')
-            this_series = et.SubElement(series, 'serie')
-            volume = et.SubElement(this_series, 'volume')
-            volume.text = pm.get_volume(publication)
-            if type(pm.get_issue(publication)) == str:
-                issue = et.SubElement(this_series, 'number')
-                issue.text = pm.get_issue(publication)
-            else:
-                pass
-        elif type(pm.get_issn(publication)) == str:
-            series = et.SubElement(conferenceContribution, 'series')
-            this_series = et.SubElement(series, 'serie')
-            issn = et.SubElement(this_series, 'printIssn')
-            issn.text = pm.get_issn(publication)
-        else:
-            pass
+        text_element(chapterInBook, 'hostPublicationTitle', journal)
+        append_text(chapterInBook, 'publisher/name', publisher_value)
+        append_series(chapterInBook, volume_value, issue_value, these_issns)
+        return chapterInBook
     else:
-        return publication
-
-
-def write_chapterInBook_xml(publication, root, setting, internal_persons):
-    if (type(pm.get_publication_year(publication)) == int) and (type(pm.get_title(publication)) == str) and (
-            type(pm.get_journal(publication)) == str):
-        chapterInBook = et.SubElement(root, "chapterInBook")
-        chapterInBook.set('id', pm.get_id(publication))
-        chapterInBook.set('subType', setting['subType'])
-        peer_review = et.SubElement(chapterInBook, 'peerReviewed')
-        peer_review.text = 'true'
-        # pub status stuff
-        pub_statuses = et.SubElement(chapterInBook, 'publicationStatuses')
-        pub_status = et.SubElement(pub_statuses, 'publicationStatus')
-        status_type = et.SubElement(pub_status, 'statusType')
-        status_type.text = 'published'
-        date = et.SubElement(pub_status, 'date')
-        the_year = et.SubElement(date, 'tns:year')
-        if type(pm.get_publication_year(publication)) != float:
-            the_year.text = str(pm.get_publication_year(publication))
-        else:
-            print('research output', pm.get_id(publication), 'is missing required year field. upload will fail.')
-        # language
-        language = et.SubElement(chapterInBook, 'language')
-        language.text = 'en_US'
-        # title
-        title = et.SubElement(chapterInBook, 'title')
-        title_text = et.SubElement(title, 'tns:text')
-        title_text.set('lang', 'en')
-        title_text.set('country', 'US')
-        title_text.text = pm.get_title(publication)
-        # abstract
-        if type(pm.get_abstract(publication)) == str:
-            abstract = et.SubElement(chapterInBook, 'abstract')
-            abstract_text = et.SubElement(abstract, 'tns:text')
-            abstract_text.set('lang', 'en')
-            abstract_text.set('country', 'US')
-            abstract_text.text = pm.get_abstract(publication)
-        else:
-            pass
-        persons = et.SubElement(chapterInBook, 'persons')
-        the_authors = pm.get_internal_external_authors(pm.get_author_data(publication), internal_persons, 79)
-        for an_author in the_authors:
-            this_author = et.SubElement(persons, 'author')
-            role = et.SubElement(this_author, 'role')
-            role.text = 'author'
-            this_person = et.SubElement(this_author, 'person')
-            this_person.set('id', str(an_author['author_id']))
-            first_name = et.SubElement(this_person, 'firstName')
-            first_name.text = an_author['author']['first_name']
-            last_name = et.SubElement(this_person, 'lastName')
-            last_name.text = an_author['author']['last_name']
-            if type(an_author['unit_affiliation']) == str:
-                if 'imported' in str(an_author['author_id']):
-                    pass
-                else:
-                    organizations = et.SubElement(this_author, 'organisations')
-                    organization = et.SubElement(organizations, 'organisation')
-                    org_name = et.SubElement(organization, 'name')
-                    org_name_text = et.SubElement(org_name, 'tns:text')
-                    org_name_text.text = an_author['unit_affiliation']
-            else:
-                pass
+        return None
 
-        # setting organizational owner (pri)
-        the_organizations = et.SubElement(chapterInBook, 'organisations')
-        the_organization = et.SubElement(the_organizations, 'organisation')
-        the_organization.set('id', '3022427')
-        owner = et.SubElement(chapterInBook, 'owner')
-        owner.set('id', '3022427')
 
-        # if we get keywords, they should go here
-        # keywords = et.SubElement(chapterInBook, 'keywords')
-        # logicalGroup = et.SubElement(keywords, 'tns:logicalGroup')
-        # structured_keywords = et.SubElement(logicalGroup, 'tns:structuredKeywords')
-        # structured_keyword = et.SubElement(structured_keywords, 'tns:structuredKeyword')
-        # free_keywords = et.SubElement(structured_keyword, 'tns:freeKeywords')
-        # free_keyword = et.SubElement(free_keywords, 'tns:freeKeyword')
-
-        if type(pm.get_url(publication)) == str:
-            these_urls = pm.get_url(publication).split(';')
-            urls = et.SubElement(chapterInBook, 'urls')
-            # this has split the urls into letters :(
-            for this_url in these_urls:
-                url = et.SubElement(urls, 'url')
-                a_url = et.SubElement(url, 'url')
-                a_url.text = this_url
-                description = et.SubElement(url, 'description')
-                description_text = et.SubElement(description, 'tns:text')
-                description_text.text = 'Other Link'
-                url_type = et.SubElement(url, 'type')
-                url_type.text = 'unspecified'
-        else:
-            print(pm.get_url(publication))
-
-        if type(pm.get_doi(publication)) == str:
-            electronic_version_doi = et.SubElement(chapterInBook, 'electronicVersionDOI')
-            doi_version = et.SubElement(electronic_version_doi, 'version')
-            doi_version.text = "publishersversion"
-            # licence = et.SubElement(electronic_version_doi, 'licence')
-            public_access = et.SubElement(electronic_version_doi, 'publicAccess')
-            public_access.text = 'unknown'
-            the_doi = et.SubElement(electronic_version_doi, 'doi')
-            the_doi.text = str(pm.get_doi(publication))
-        else:
-            pass
+# research output subType (from pm.get_research_output_type) -> the function that writes that record
+WRITERS = {
+    'chapter': write_chapterInBook_xml,
+    'conference': write_conferencePaper_xml,
+    'article': write_journal_article_xml,
+    'technical_report': write_tech_report_xml,
+    'preprint': write_preprint_xml,
+    'book': write_book_xml,
+    'magazine_newspaper_essay': write_magazine_article_xml,
+}
 
-        # setting page ranges and number of pages
-        if type(pm.get_pages_range(publication)) == str:
-            the_pages = et.SubElement(chapterInBook, 'pages')
-            the_pages.text = pm.get_pages_range(publication)
-        else:
-            pass
-        if type(pm.get_number_pages(publication)) == str:
-            number_pages = et.SubElement(chapterInBook, 'numberOfPages')
-            number_pages.text = pm.get_number_pages(publication)
-        else:
-            pass
-        # setting print ISBNs- this will require manual data cleaning because
-        # Susan's script has both print and electronic isbns in the same column
-        # right now
-        if type(pm.get_isbn(publication)) == str:
-            print_isbns = et.SubElement(chapterInBook, 'printIsbns')
-            isbn = et.SubElement(print_isbns, 'isbn')
-            isbn.text = pm.get_isbn(publication)
-            print(pm.get_isbn(publication))
-        else:
-            pass
-        # setting host publication (book/anthology title)
-        host_pub = et.SubElement(chapterInBook, 'hostPublicationTitle')
-        try:
-            host_pub.text = str(pm.get_journal(publication))
-        except TypeError:
-            print('there is no host publication title. this is a required field. upload will fail.')
-        if type(pm.get_publisher(publication)) == str:
-            publisher = et.SubElement(chapterInBook, 'publisher')
-            publisher_name = et.SubElement(publisher, 'name')
-            publisher_name.text = pm.get_publisher(publication)
-        else:
-            pass
-        if type(pm.get_volume(publication)) == str and type(pm.get_issn(publication)) == str:
-            series = et.SubElement(chapterInBook, 'series')
-            this_series = et.SubElement(series, 'serie')
-            volume = et.SubElement(this_series, 'volume')
-            volume.text = pm.get_volume(publication)
-            if type(pm.get_issue(publication)) == str:
-                issue = et.SubElement(this_series, 'number')
-                issue.text = pm.get_issue(publication)
-            else:
-                pass
-            issn = et.SubElement(this_series, 'printIssn')
-            issn.text = pm.get_issn(publication)
-        elif type(pm.get_volume(publication)) == str:
-            series = et.SubElement(chapterInBook, 'series')
-            this_series = et.SubElement(series, 'serie')
-            volume = et.SubElement(this_series, 'volume')
-            volume.text = pm.get_volume(publication)
-            if type(pm.get_issue(publication)) == str:
-                issue = et.SubElement(this_series, 'number')
-                issue.text = pm.get_issue(publication)
-            else:
-                pass
-        elif type(pm.get_issn(publication)) == str:
-            series = et.SubElement(chapterInBook, 'series')
-            this_series = et.SubElement(series, 'serie')
-            issn = et.SubElement(this_series, 'printIssn')
-            issn.text = pm.get_issn(publication)
-        else:
-            pass
-    else:
-        return publication
-main()
+
+if __name__ == '__main__':
+    main()
 